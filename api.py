@@ -0,0 +1,301 @@
+"""
+Headless JSON API over the same analyzers and database as the Streamlit app.
+
+    uvicorn api:app --host 0.0.0.0 --port 8000 --workers 1
+
+Every route except /health and /auth/login needs an `Authorization: Bearer <token>`
+header carrying the JWT returned by /auth/login (Auth.generate_token). Model-backed
+routes are plain `def` handlers, so FastAPI runs them on its thread pool and the event
+loop stays free; the shared inference_slot semaphore still caps concurrent forward passes.
+Research papers are analyzed as background jobs: POST a PDF, then poll the job.
+"""
+import io
+import json
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from bson import ObjectId  # type: ignore
+from bson.errors import InvalidId  # type: ignore
+from fastapi import Depends, FastAPI, File, HTTPException, Query, Request, UploadFile  # type: ignore
+from fastapi.encoders import jsonable_encoder  # type: ignore
+from fastapi.responses import JSONResponse, PlainTextResponse  # type: ignore
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer  # type: ignore
+from pydantic import BaseModel, Field  # type: ignore
+from config.config import Config
+from utils.admission import ANALYSIS_ADMISSION, ServerBusy
+from utils.auth import Auth
+from utils.metrics import REGISTRY
+from utils.rate_limit import LoginThrottled, client_address
+from utils.structured_logging import correlation_scope
+from utils.records import SymptomEntry, WellnessGoals, WellnessLog, decode_wellness_columns
+from utils.research_analyzer import ResearchAnalyzer
+from utils.symptom_analyzer import SymptomAnalyzer
+from utils.wellness_analytics import WellnessAnalytics
+
+app = FastAPI(title="HealthEase API", version="1.0")
+bearer = HTTPBearer(auto_error=False)
+
+
+@lru_cache(maxsize=None)
+def get_auth():
+    return Auth()
+
+
+@lru_cache(maxsize=None)
+def get_symptom_analyzer():
+    return SymptomAnalyzer()
+
+
+@lru_cache(maxsize=None)
+def get_research_analyzer():
+    return ResearchAnalyzer()
+
+
+@app.middleware("http")
+async def correlation_id(request: Request, call_next):
+    # Clients may pass their own request id; it tags every log record of the request
+    with correlation_scope("api", request.headers.get("X-Request-ID")) as request_id:
+        response = await call_next(request)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+
+@app.exception_handler(ServerBusy)
+async def server_busy(request: Request, exc: ServerBusy):
+    return JSONResponse(
+        status_code=503, content={"detail": str(exc), "reason": exc.reason},
+        headers={"Retry-After": str(int(exc.retry_after + 0.5))}
+    )
+
+
+@app.exception_handler(LoginThrottled)
+async def login_throttled(request: Request, exc: LoginThrottled):
+    return JSONResponse(
+        status_code=429, content={"detail": str(exc), "scope": exc.scope},
+        headers={"Retry-After": str(int(exc.retry_after + 0.5))}
+    )
+
+
+def client_ip(request: Request):
+    return client_address(request.client.host if request.client else None, request.headers.get("x-forwarded-for"))
+
+
+def get_db():
+    db = get_auth().db
+    if db.db is None:
+        raise HTTPException(status_code=503, detail="Database unavailable")
+    return db
+
+
+def current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer)):
+    user_id = get_auth().verify_token(credentials.credentials) if credentials else None
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="Invalid or expired token", headers={"WWW-Authenticate": "Bearer"})
+    # Tokens outlive accounts: a deleted (or being deleted) user must not write new rows
+    if not get_db().is_active_user(user_id):
+        raise HTTPException(status_code=401, detail="Account no longer exists", headers={"WWW-Authenticate": "Bearer"})
+    return user_id
+
+
+def to_json(value):
+    return jsonable_encoder(value, custom_encoder={ObjectId: str})
+
+
+class LoginRequest(BaseModel):
+    email: str
+    password: str
+
+
+class SymptomRequest(BaseModel):
+    symptoms: str = Field(min_length=10, max_length=5000)
+
+
+class WellnessLogRequest(BaseModel):
+    mood_code: int = Field(ge=0, le=4)
+    sleep_hours: float = Field(ge=0, le=24)
+    water_glasses: int = Field(ge=0, le=20)
+    exercise_minutes: int = Field(ge=0, le=300)
+
+
+class ResearchJobs:
+    """
+    In-process job table for research analyses. Finished jobs beyond `max_jobs` are evicted oldest first.
+    """
+
+    def __init__(self, max_workers=Config.MAX_CONCURRENT_INFERENCES, max_jobs=1000):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="research-job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_jobs = max_jobs
+
+    def submit(self, user_id, file_name, data):
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            # Bounded backlog: beyond it, clients are told to retry instead of piling up uploads in memory
+            if sum(job["status"] == "queued" for job in self._jobs.values()) >= Config.MAX_QUEUED_ANALYSES:
+                raise ServerBusy("queue_full", ANALYSIS_ADMISSION.retry_after())
+            self._jobs[job_id] = {"id": job_id, "user_id": user_id, "file_name": file_name, "status": "queued",
+                                  "created_at": datetime.now(timezone.utc)}
+            self._evict()
+        self._executor.submit(self._run, job_id, user_id, file_name, data)
+        return job_id
+
+    def get(self, user_id, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job and job["user_id"] == user_id else None
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+
+    def _evict(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job["status"] in ("done", "failed")]
+        for job_id in finished[:max(0, len(self._jobs) - self.max_jobs)]:
+            del self._jobs[job_id]
+
+    def _run(self, job_id, user_id, file_name, data):
+        self._update(job_id, status="running")
+        try:
+            self._update(job_id, status="done", **self._analyze(user_id, file_name, data))
+        except Exception as e:
+            self._update(job_id, status="failed", error=str(e))
+
+    @staticmethod
+    def _analyze(user_id, file_name, data):
+        upload = io.BytesIO(data)
+        upload.name = file_name
+        analyzer = get_research_analyzer()
+        content_hash = ResearchAnalyzer.content_hash(upload)
+        db = get_auth().db
+        # Same file and model as an earlier job: return the stored analysis instead of re-running
+        saved = db.find_research_analysis(user_id, content_hash, analyzer.model_version)
+        if saved:
+            return {"analysis_id": saved["_id"], "result": saved, "cached": True}
+        with ANALYSIS_ADMISSION.admit():
+            result = analyzer.analyze_research_paper(upload)
+        if "error" in result:
+            raise RuntimeError(result["error"])
+        analysis = {"file_name": file_name, "content_hash": content_hash, **result}
+        inserted = db.save_research_analysis(user_id, dict(analysis))
+        analysis.pop("preview", None)
+        return {"analysis_id": inserted.inserted_id if inserted else None, "result": analysis, "cached": False}
+
+
+research_jobs = ResearchJobs()
+
+
+@app.get("/health")
+def health():
+    return {"status": "ok", "database": get_auth().db.db is not None}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return REGISTRY.render()
+
+
+@app.post("/auth/login")
+def login(body: LoginRequest, request: Request):
+    ok, result = get_auth().login_user(body.email, body.password, ip=client_ip(request))
+    if not ok:
+        raise HTTPException(status_code=401, detail=result)
+    return result
+
+
+@app.post("/symptoms/analyze")
+def analyze_symptoms(body: SymptomRequest, user_id: str = Depends(current_user)):
+    with ANALYSIS_ADMISSION.admit():
+        analysis = json.loads(get_symptom_analyzer().analyze_symptoms(body.symptoms))
+    if "error" in analysis:
+        raise HTTPException(status_code=500, detail=analysis["message"])
+    entry = SymptomEntry.from_analysis(body.symptoms, analysis)
+    saved = get_db().save_symptom_history(user_id, entry.to_bson())
+    return to_json({"id": saved.inserted_id if saved else None, **entry.to_bson()})
+
+
+@app.get("/symptoms/history")
+def symptom_history(user_id: str = Depends(current_user), limit: int = Query(Config.SYMPTOM_HISTORY_PAGE_SIZE, ge=1, le=100),
+                    before: str = Query(None, description="`next` cursor from the previous page")):
+    cursor = None
+    if before:
+        try:
+            timestamp, last_id = before.split("|")
+            cursor = (datetime.fromisoformat(timestamp), ObjectId(last_id))
+        except (ValueError, InvalidId):
+            raise HTTPException(status_code=400, detail="Malformed cursor")
+    docs, next_cursor = get_db().get_symptom_history_page(user_id, limit=limit, before=cursor)
+    items = []
+    for doc in docs:
+        try:
+            items.append({"id": doc["_id"], **SymptomEntry.from_bson(doc).to_bson()})
+        except (KeyError, TypeError, ValueError):
+            continue
+    return to_json({
+        "items": items,
+        "next": f"{next_cursor[0].isoformat()}|{next_cursor[1]}" if next_cursor else None
+    })
+
+
+@app.post("/research/jobs", status_code=202)
+async def submit_research_job(file: UploadFile = File(...), user_id: str = Depends(current_user)):
+    if file.content_type not in ("application/pdf", "application/octet-stream"):
+        raise HTTPException(status_code=415, detail="Upload a PDF file")
+    data = await file.read()
+    if not data:
+        raise HTTPException(status_code=400, detail="Empty file")
+    return {"job_id": research_jobs.submit(user_id, file.filename or "paper.pdf", data)}
+
+
+@app.get("/research/jobs/{job_id}")
+def research_job(job_id: str, user_id: str = Depends(current_user)):
+    job = research_jobs.get(user_id, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    job.pop("user_id")
+    return to_json(job)
+
+
+@app.get("/research/history")
+def research_history(user_id: str = Depends(current_user), q: str = "", limit: int = Query(20, ge=1, le=100)):
+    return to_json({"items": get_db().search_research_analyses(user_id, q, limit=limit)})
+
+
+@app.post("/wellness/logs", status_code=201)
+def save_wellness_log(body: WellnessLogRequest, user_id: str = Depends(current_user)):
+    try:
+        log = WellnessLog(timestamp=datetime.now(timezone.utc), **body.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if not get_db().save_wellness_log(user_id, log):
+        raise HTTPException(status_code=500, detail="Failed to save wellness log")
+    return to_json(log.to_bson())
+
+
+@app.get("/wellness/logs")
+def wellness_logs(user_id: str = Depends(current_user)):
+    logs = []
+    for doc in get_db().get_user_wellness_logs(user_id):
+        try:
+            logs.append(WellnessLog.from_bson(doc).to_bson())
+        except (KeyError, TypeError, ValueError):
+            continue
+    return to_json({"items": logs})
+
+
+@app.get("/wellness/trends")
+def wellness_trends(user_id: str = Depends(current_user), tz: str = "Asia/Kolkata"):
+    try:
+        ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Unknown time zone: {tz}")
+    db = get_db()
+    saved = db.get_latest_wellness_goals(user_id)
+    goals = WellnessGoals.from_bson(saved) if saved else WellnessGoals(sleep_goal=8, water_goal=8, exercise_goal=30)
+    analytics = WellnessAnalytics(goals, tz_name=tz).update(decode_wellness_columns(db.get_user_wellness_logs(user_id)))
+    return to_json({"goals": goals.to_bson(), "summary": analytics.summary()})
@@ -16,8 +16,18 @@ from utils.research_analyzer import ResearchAnalyzer
 from utils.symptom_analyzer import SymptomAnalyzer
 from utils.wellness_tracker import WellnessTracker
 from utils.database import MongoDB, ObjectId # Ensure ObjectId is imported
+from utils.semantic_index import EmbeddingIndex, RESEARCH_INDEX, SYMPTOM_INDEX
+from utils.records import SymptomEntry
+from config.config import Config
+from utils.metrics import start_metrics_server
+from utils.structured_logging import correlation_scope
+from utils.profiling import profile_request
+from utils.admission import ANALYSIS_ADMISSION, ServerBusy
+from utils.rate_limit import LoginThrottled, client_address
+from contextlib import contextmanager
 
 load_dotenv()
+start_metrics_server() # No-op unless METRICS_PORT is set; starts once per process
 
 # --- Page Config ---
 st.set_page_config(
@@ -292,6 +302,15 @@ def load_css():
 # Assumes utils.auth and utils.database are available and configured
 @st.cache_resource
 def get_auth_instance(): return Auth()
+# Analyzers are shared by every session so models load once and forward passes go through one concurrency policy
+@st.cache_resource
+def get_research_analyzer(): return ResearchAnalyzer()
+@st.cache_resource
+def get_symptom_analyzer(): return SymptomAnalyzer()
+@st.cache_resource
+def get_research_index(): return EmbeddingIndex(Config.EMBEDDING_INDEX_DIR, RESEARCH_INDEX, get_research_analyzer().model.config.hidden_size)
+@st.cache_resource
+def get_symptom_index(): return EmbeddingIndex(Config.EMBEDDING_INDEX_DIR, SYMPTOM_INDEX, get_symptom_analyzer().model.config.hidden_size)
 @st.cache_resource
 def get_db_instance():
     try:
@@ -488,6 +507,12 @@ def landing_page():
         st.markdown('</div>', unsafe_allow_html=True)
 
 
+def client_ip():
+    """Client address for login throttling; X-Forwarded-For only counts behind a TRUSTED_PROXIES peer."""
+    context = getattr(st, "context", None)
+    headers = getattr(context, "headers", None) or {}
+    return client_address(getattr(context, "ip_address", None), headers.get("X-Forwarded-For"))
+
 def login_page():
     # Use general page container
     st.markdown('<h1 style="text-align: center; border-bottom: none; margin-bottom: 1.5rem;">Welcome Back!</h1>', unsafe_allow_html=True)
@@ -499,7 +524,8 @@ def login_page():
         if submitted:
             if not email or not password: st.warning("Please enter email and password.", icon="⚠️"); return
             # Assumes check_authentication is imported and works
-            user = check_authentication(email, password)
+            try: user = check_authentication(email, password, ip=client_ip())
+            except LoginThrottled as e: st.error(str(e), icon="⏳"); return
             if user:
                 st.session_state.user = user
                 st.session_state.page = "Home"
@@ -544,31 +570,158 @@ def logged_in_home_page(): # Dashboard
     user = st.session_state.user
     st.markdown(f"<p style='font-size: 1.1em; color: var(--secondary-color);'>Select a tool from the sidebar menu to get started.</p>", unsafe_allow_html=True)
 
+def render_research_result(summary, key_points, caption=None):
+    st.markdown("<h3>Summary</h3>", unsafe_allow_html=True); st.markdown(f"<div style='background-color: var(--light-color); padding: 15px; border-radius: 6px; border: 1px solid #e0e0e0; margin-bottom: 1rem; color: var(--text-color);'>{summary}</div>", unsafe_allow_html=True)
+    if caption: st.caption(caption)
+    if key_points:
+        st.markdown("<h3>Key Points</h3>", unsafe_allow_html=True)
+        st.markdown("<ul>", unsafe_allow_html=True)
+        for point in key_points: st.markdown(f"<li style='color: var(--text-color);'>{point}</li>", unsafe_allow_html=True)
+        st.markdown("</ul>", unsafe_allow_html=True)
+    else: st.markdown("<p style='color: var(--secondary-color);'><em>No specific key points extracted.</em></p>", unsafe_allow_html=True)
+
+def index_research_analysis(analyzer, user_id, analysis_id, analysis):
+    try: get_research_index().add([str(analysis_id)], analyzer.embed([ResearchAnalyzer.embedding_text(analysis)]), owner=user_id)
+    except Exception as e: print(f"Could not index research analysis: {e}")
+
+def render_similar_papers(analyzer, user_id, analysis, exclude_id=None):
+    if auth.db is None: return
+    try:
+        query = analyzer.embed([ResearchAnalyzer.embedding_text(analysis)])[0]
+        hits = get_research_index().search(query, k=6, owner=user_id, exclude_ids={str(exclude_id)} if exclude_id else ())
+        scores = dict(hits); docs = [d for d in auth.db.get_research_analyses_by_ids(user_id, [h[0] for h in hits]) if d.get("content_hash") != analysis.get("content_hash")][:3]
+    except Exception as e: print(f"Similar paper search failed: {e}"); return
+    if docs:
+        st.markdown("<h3>Similar Papers You've Analyzed</h3>", unsafe_allow_html=True)
+        for doc in docs: st.markdown(f"- **{doc.get('file_name', 'Untitled')}** (similarity {scores.get(str(doc['_id']), 0):.2f})")
+
+@contextmanager
+def analysis_admission():
+    """Waits for a shared analysis slot, showing the queue position; raises ServerBusy when the request is shed."""
+    notice = st.empty()
+    try:
+        with ANALYSIS_ADMISSION.admit(on_wait=lambda position: notice.info(f"The analyzers are busy right now, you're #{position} in queue.", icon="⏳")):
+            notice.empty(); yield
+    finally: notice.empty()
+
+def busy_message(busy): return f"Too many analyses are running right now. Please try again in about {busy.retry_after:.0f} seconds."
+
+def research_batch_results(uploaded_files):
+    with st.container(border=True):
+        st.markdown(f"<h2>Batch Results ({len(uploaded_files)} files)</h2>", unsafe_allow_html=True)
+        batch_key = tuple(f.file_id for f in uploaded_files)
+        cached = st.session_state.get("ra_batch_results")
+        if cached is None or cached[0] != batch_key: # Reruns (e.g. download clicks) reuse the finished batch
+            with st.spinner(f"🤖 Analyzing {len(uploaded_files)} papers... This may take several minutes."):
+                try:
+                    with analysis_admission(): st.session_state.ra_batch_results = (batch_key, get_research_analyzer().analyze_research_papers(uploaded_files))
+                except ServerBusy as busy: st.warning(busy_message(busy), icon="⏳"); return
+                except Exception as e: st.error(f"Batch analysis failed: {e}", icon="🚨"); return
+            user_id = (st.session_state.user or {}).get("_id")
+            if user_id and auth.db is not None:
+                for result in st.session_state.ra_batch_results[1]:
+                    if "error" not in result and "duplicate_of" not in result:
+                        saved = auth.db.save_research_analysis(user_id, dict(result))
+                        if saved: index_research_analysis(get_research_analyzer(), user_id, saved.inserted_id, result)
+        results = st.session_state.ra_batch_results[1]
+        table = ResearchAnalyzer.results_to_dataframe(results)
+        st.dataframe(table[["file_name", "duplicate_of", "summary_source", "summary", "error"]], use_container_width=True, hide_index=True)
+        col_csv, col_json = st.columns(2)
+        with col_csv: st.download_button("⬇️ Download CSV", table.to_csv(index=False).encode("utf-8"), file_name="research_batch_results.csv", mime="text/csv", use_container_width=True)
+        with col_json: st.download_button("⬇️ Download JSON", json.dumps(results, indent=2, default=str).encode("utf-8"), file_name="research_batch_results.json", mime="application/json", use_container_width=True)
+        for result in results:
+            if "error" in result or "duplicate_of" in result: continue
+            with st.expander(f"📄 {result['file_name']}"):
+                render_research_result(result["summary"], result["key_points"], caption="AI summary" if result["summary_source"] == "abstractive" else "Extractive summary (AI summary unavailable)")
+
+def research_single_result(uploaded_file):
+    with st.container(border=True): # Use border=True
+        st.markdown("<h2>Analysis Results</h2>", unsafe_allow_html=True)
+        result_area = st.empty()
+        try:
+            analyzer = get_research_analyzer()
+            user_id = (st.session_state.user or {}).get("_id"); content_hash = ResearchAnalyzer.content_hash(uploaded_file)
+            saved = auth.db.find_research_analysis(user_id, content_hash, analyzer.stream_model_version) if user_id and auth.db is not None else None
+            if saved and st.session_state.get("ra_rerun_hash") != content_hash: # Reopen the stored result instead of re-running the models
+                saved_at = saved["timestamp"].strftime('%Y-%m-%d %H:%M') if isinstance(saved.get("timestamp"), datetime) else "earlier"
+                with result_area.container(): render_research_result(saved.get("summary", ""), saved.get("key_points", []), caption=f"💾 Saved analysis from {saved_at} ({saved.get('model_version', 'unknown model')}).")
+                render_similar_papers(analyzer, user_id, saved, exclude_id=saved["_id"])
+                if st.button("Re-run analysis", key="ra_rerun_button"): st.session_state.ra_rerun_hash = content_hash; st.rerun()
+                return
+            with analysis_admission(), profile_request("research_stream"): # Opt-in (PROFILING_ENABLED); keeps a report only when slow
+                with st.spinner("📄 Reading paper..."):
+                    start = time.perf_counter(); index = analyzer.prepare_document(uploaded_file); extract_ms = (time.perf_counter() - start) * 1000
+                    start = time.perf_counter(); preview = analyzer.build_preview(index); preview_ms = (time.perf_counter() - start) * 1000
+                with result_area.container():
+                    render_research_result(preview["summary"], preview["key_points"], caption=f"⚡ Extractive preview ({preview_ms:.0f} ms). The AI summary is being written below.")
+                stream_area = st.empty(); stats = {}
+                with stream_area.container():
+                    st.markdown("<h3>AI Summary (writing...)</h3>", unsafe_allow_html=True)
+                    st.write_stream(analyzer.stream_multi_chunk_summarize(index.text, stats=stats))
+                stream_area.empty()
+                summary = stats.get("summary") or preview["summary"]
+                source_note = "AI summary" if stats.get("summary") else "Extractive summary (AI summary unavailable)"
+                ttft = stats.get("time_to_first_token_ms"); cache_note = f" ({stats['cached_chunks']} cached chunk(s))" if stats.get("cached_chunks") else ""
+                with result_area.container():
+                    render_research_result(summary, preview["key_points"], caption=f"{source_note} · extraction {extract_ms:.0f} ms · preview {preview_ms:.0f} ms · first token {f'{ttft:.0f} ms' if ttft is not None else 'n/a'} · summary {stats.get('total_ms', 0) / 1000:.1f} s{cache_note}")
+                st.session_state.ra_rerun_hash = None
+            if user_id and auth.db is not None:
+                analysis = {
+                    "file_name": uploaded_file.name, "content_hash": content_hash, "model_version": analyzer.stream_model_version,
+                    "summary": summary, "summary_source": "abstractive" if stats.get("summary") else "extractive", "key_points": preview["key_points"],
+                    "timings": {"extract_ms": extract_ms, "preview_ms": preview_ms, "time_to_first_token_ms": ttft, "summarize_ms": stats.get("total_ms")}
+                }
+                saved = auth.db.save_research_analysis(user_id, dict(analysis))
+                if saved: index_research_analysis(analyzer, user_id, saved.inserted_id, analysis)
+                render_similar_papers(analyzer, user_id, analysis, exclude_id=saved.inserted_id if saved else None)
+        except ServerBusy as busy: st.warning(busy_message(busy), icon="⏳")
+        except Exception as e: st.error(f"Analysis failed: {e}", icon="🚨")
+
 def research_analyzer_page():
     st.markdown("<h1>📄 Research Paper Analyzer</h1>", unsafe_allow_html=True)
     with st.container(border=True): # Use border=True for visual grouping
         st.markdown("<h2>Upload & Analyze</h2>", unsafe_allow_html=True)
-        st.markdown("<p>Select a research paper (PDF). Our AI will summarize and extract key points. Analysis may take a few minutes.</p>", unsafe_allow_html=True)
-        uploaded_file = st.file_uploader("Select PDF File", type=['pdf'], key="ra_uploader_input", label_visibility="collapsed")
-
-    if uploaded_file:
-        with st.container(border=True): # Use border=True
-            st.markdown("<h2>Analysis Results</h2>", unsafe_allow_html=True)
-            with st.spinner("🤖 Analyzing paper... Please wait."):
-                try:
-                    # Assumes ResearchAnalyzer is imported and works
-                    analyzer = ResearchAnalyzer(); result = analyzer.analyze_research_paper(uploaded_file)
-                    if isinstance(result, str): result = json.loads(result)
-                    elif not isinstance(result, dict): raise ValueError("Unexpected result type")
-                    summary = result.get("summary", "No summary generated."); key_points = result.get("key_points", [])
-                    st.markdown("<h3>Summary</h3>", unsafe_allow_html=True); st.markdown(f"<div style='background-color: var(--light-color); padding: 15px; border-radius: 6px; border: 1px solid #e0e0e0; margin-bottom: 1rem; color: var(--text-color);'>{summary}</div>", unsafe_allow_html=True)
-                    if key_points:
-                        st.markdown("<h3>Key Points</h3>", unsafe_allow_html=True)
-                        st.markdown("<ul>", unsafe_allow_html=True)
-                        for point in key_points: st.markdown(f"<li style='color: var(--text-color);'>{point}</li>", unsafe_allow_html=True)
-                        st.markdown("</ul>", unsafe_allow_html=True)
-                    else: st.markdown("<p style='color: var(--secondary-color);'><em>No specific key points extracted.</em></p>", unsafe_allow_html=True)
-                except Exception as e: st.error(f"Analysis failed: {e}", icon="🚨")
+        st.markdown("<p>Select a research paper (PDF). An instant preview appears first; the full AI summary replaces it when ready (may take a few minutes).</p>", unsafe_allow_html=True)
+        is_researcher = (st.session_state.user or {}).get("role", "").lower() == "researcher"
+        if is_researcher: # Researchers can analyze literature in bulk
+            st.caption("Researcher accounts can select several PDFs at once for a combined batch analysis.")
+            uploaded_files = st.file_uploader("Select PDF Files", type=['pdf'], accept_multiple_files=True, key="ra_batch_uploader_input", label_visibility="collapsed") or []
+            uploaded_file = uploaded_files[0] if len(uploaded_files) == 1 else None
+        else:
+            uploaded_files = []
+            uploaded_file = st.file_uploader("Select PDF File", type=['pdf'], key="ra_uploader_input", label_visibility="collapsed")
+
+    if len(uploaded_files) > 1:
+        research_batch_results(uploaded_files)
+    elif uploaded_file:
+        research_single_result(uploaded_file)
+
+    research_history_section()
+
+def research_history_section():
+    user_id = (st.session_state.user or {}).get("_id")
+    if not user_id or auth.db is None: return
+    with st.container(border=True):
+        st.markdown("<h2>🔎 Past Analyses</h2>", unsafe_allow_html=True)
+        query = st.text_input("Search your saved summaries and key points", key="ra_search_input", placeholder="e.g., randomized trial hypertension")
+        matches = auth.db.search_research_analyses(user_id, query, limit=10)
+        if not matches: st.caption("No saved analyses match." if query else "Analyses you run are saved here automatically."); return
+        for match in matches:
+            saved_at = match["timestamp"].strftime('%Y-%m-%d %H:%M') if isinstance(match.get("timestamp"), datetime) else ""
+            with st.expander(f"📄 {match.get('file_name', 'Untitled')} · {saved_at}"):
+                render_research_result(match.get("summary", ""), match.get("key_points", []), caption=f"Model: {match.get('model_version', 'unknown')}")
+
+def render_similar_reports(user_id, symptoms, history_id=None):
+    try:
+        query = get_symptom_analyzer().embed([symptoms])
+        hits = get_symptom_index().search(query[0], k=3, owner=user_id)
+        if history_id: get_symptom_index().add([str(history_id)], query, owner=user_id) # Index after searching so the new report doesn't match itself
+        past = auth.db.get_symptom_history_by_ids(user_id, [h[0] for h in hits])
+    except Exception as e: print(f"Similar report search failed: {e}"); return
+    if past:
+        st.markdown("<h4>🔁 Similar Past Reports:</h4>", unsafe_allow_html=True)
+        for entry in map(SymptomEntry.from_bson, past):
+            st.markdown(f"- *{entry.timestamp:%Y-%m-%d}* · {entry.severity} · {entry.symptoms[:120]}")
 
 def symptom_analyzer_page():
     st.markdown("<h1>🩺 AI Symptom Analyzer</h1>", unsafe_allow_html=True)
@@ -586,13 +739,13 @@ def symptom_analyzer_page():
                 with st.spinner("🧠 Analyzing symptoms..."):
                     try:
                         # Assumes SymptomAnalyzer is imported and works
-                        analyzer = SymptomAnalyzer(); result = analyzer.analyze_symptoms(symptoms)
+                        with analysis_admission(): result = get_symptom_analyzer().analyze_symptoms(symptoms)
                         if isinstance(result, str): result = json.loads(result)
                         elif not isinstance(result, dict): raise ValueError("Unexpected result type")
-                        user_id = st.session_state.user.get("_id") if st.session_state.user else None
+                        user_id = st.session_state.user.get("_id") if st.session_state.user else None; saved_history = None
                         if user_id and auth.db is not None:
-                            history_data = {"symptoms": symptoms, "recommendation": result, "timestamp": datetime.now(timezone.utc).isoformat()};
-                            try: auth.db.save_symptom_history(user_id, history_data)
+                            history_data = SymptomEntry.from_analysis(symptoms, result).to_bson()
+                            try: saved_history = auth.db.save_symptom_history(user_id, history_data); st.session_state.pop("symptom_history_pages", None) # Profile reloads its first page
                             except Exception as db_err: st.warning(f"Could not save history: {db_err}", icon="💾")
                         elif user_id and auth.db is None: st.warning("DB unavailable, history not saved.", icon="💾")
                         analysis_data = result.get("Analysis Results", result)
@@ -602,8 +755,10 @@ def symptom_analyzer_page():
                             if possible_conditions: st.markdown("<h4>Possible Conditions (AI Suggestion):</h4>", unsafe_allow_html=True); cond_html = "".join(f"<li style='color: var(--text-color);'>{cond}</li>" for cond in possible_conditions); st.markdown(f"<ul>{cond_html}</ul>", unsafe_allow_html=True)
                             if recommendations: st.markdown("<h4>💡 Recommendations:</h4>", unsafe_allow_html=True); rec_html = "".join(f"<li style='color: var(--text-color);'>{rec}</li>" for rec in recommendations); st.markdown(f"<ul>{rec_html}</ul>", unsafe_allow_html=True)
                             else: st.markdown("<p><em>No specific recommendations provided.</em></p>", unsafe_allow_html=True)
+                            if user_id and auth.db is not None: render_similar_reports(user_id, symptoms, saved_history.inserted_id if saved_history else None)
                             st.markdown("<hr>", unsafe_allow_html=True); st.markdown(f"<p style='color:var(--secondary-color); font-style: italic; font-size: 0.9em;'><strong>Disclaimer:</strong> Consult a healthcare professional.</p>", unsafe_allow_html=True)
                         else: st.error("Unexpected analysis format.", icon="❓"); print(f"Unexpected SA format: {result}")
+                    except ServerBusy as busy: st.warning(busy_message(busy), icon="⏳")
                     except Exception as e: st.error(f"Analysis Error: {e}", icon="🚨")
 
 def wellness_tracker_page():
@@ -613,12 +768,42 @@ def wellness_tracker_page():
         st.info("Track metrics, visualize trends, and stay proactive.", icon="📊")
         try:
             # Assumes WellnessTracker is imported and works
-            tracker = WellnessTracker()
+            tracker = WellnessTracker(auth.db) # Reuse the shared connection instead of opening one per rerun
             tracker.render_dashboard()
         except AttributeError: # Specific fallback if render_dashboard is missing
              st.warning("Tracker dashboard rendering not fully implemented.", icon="🛠️"); st.markdown("---"); st.markdown("<h4>Example Metrics:</h4>", unsafe_allow_html=True); cols = st.columns(3); cols[0].metric("Avg Heart Rate", "72 bpm"); cols[1].metric("Steps Today", "6,540"); cols[2].metric("Sleep Score", "85"); st.line_chart(data={'Score': [70, 75, 85, 82, 88]})
         except Exception as e: st.error(f"Error loading tracker: {e}", icon="🚨")
 
+def symptom_history_state(user_id):
+    """Loaded pages of the profile's symptom history, kept in the session so reruns don't refetch."""
+    history = st.session_state.get("symptom_history_pages")
+    if history is None or history["user_id"] != user_id:
+        # Legacy entries are rewritten to the canonical shape once, so pages sort and render without parsing
+        auth.db.normalize_symptom_history(user_id)
+        history = {"user_id": user_id, "entries": [], "cursor": None}
+        load_symptom_history_page(history)
+        st.session_state["symptom_history_pages"] = history
+    return history
+
+def load_symptom_history_page(history):
+    docs, history["cursor"] = auth.db.get_symptom_history_page(history["user_id"], limit=Config.SYMPTOM_HISTORY_PAGE_SIZE, before=history["cursor"])
+    for doc in docs:
+        try: history["entries"].append(SymptomEntry.from_bson(doc))
+        except (KeyError, TypeError, ValueError): continue # Skip malformed legacy entries
+
+def render_symptom_entry(entry, expanded=False):
+    display_time = entry.timestamp.strftime('%Y-%m-%d %H:%M %Z')
+    with st.expander(f"🗓️ Entry: {display_time}", expanded=expanded):
+        st.markdown(f"**Symptoms Reported:**"); st.markdown(f"<p style='background-color: #141413; padding: 10px; border-radius: 5px; color: var(--text-color);'>{entry.symptoms}</p>", unsafe_allow_html=True); st.markdown(f"**AI Analysis:**") # Ensure text color
+        if entry.severity != "N/A" or entry.recommendations:
+            st.markdown(f"*   **Severity:** {entry.severity}")
+            st.markdown(f"*   **Confidence:** {f'{entry.confidence:.2f}%' if entry.confidence is not None else 'N/A'}")
+            if entry.recommendations:
+                st.markdown("*   **Recommendations:**")
+                for advice in entry.recommendations: st.markdown(f"    *   {advice}") # Indented list
+            if entry.note: st.markdown(f"*   **Note:** {entry.note}")
+        else: st.caption("No formatted AI analysis available.")
+
 def profile_page():
     st.markdown("<h1>👤 User Profile</h1>", unsafe_allow_html=True)
     user = st.session_state.user
@@ -633,32 +818,12 @@ def profile_page():
             if auth.db is None: st.warning("DB unavailable. Cannot load history.", icon="💾")
             else:
                 try:
-                    symptom_data = auth.db.get_symptom_history(user["_id"])
-                    if symptom_data:
-                        st.caption(f"{len(symptom_data)} entr{'y' if len(symptom_data) == 1 else 'ies'} found. Showing newest first.")
-                        for i, entry in enumerate(reversed(symptom_data)):
-                            timestamp_str = entry.get("timestamp", "N/A"); symptoms = entry.get("symptoms", "N/A"); display_time = timestamp_str;
-                            try: display_time = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00")).strftime('%Y-%m-%d %H:%M %Z') # Handle Z timezone
-                            except: pass
-                            with st.expander(f"🗓️ Entry: {display_time}", expanded=(i < 2)):
-                                st.markdown(f"**Symptoms Reported:**"); st.markdown(f"<p style='background-color: #141413; padding: 10px; border-radius: 5px; color: var(--text-color);'>{symptoms}</p>", unsafe_allow_html=True); st.markdown(f"**AI Analysis:**") # Ensure text color
-                                recommendation_raw = entry.get("recommendation", {}); recommendation = recommendation_raw;
-                                if isinstance(recommendation, str):
-                                    try: recommendation = json.loads(recommendation);
-                                    except: recommendation = {}
-                                # Handle cases where recommendation might be a list containing the dict
-                                if isinstance(recommendation, list) and len(recommendation) > 0 and isinstance(recommendation[0], dict): recommendation = recommendation[0];
-
-                                analysis_results = recommendation.get("Analysis Results", recommendation) # Check top level too
-                                if isinstance(analysis_results, dict) and analysis_results:
-                                    severity = analysis_results.get("Severity", "N/A"); confidence = analysis_results.get("Confidence", "N/A"); advice_list = analysis_results.get("Recommendations", []); note = analysis_results.get("⚠️ Note", analysis_results.get("Note", "")) # Check for note variations
-                                    st.markdown(f"*   **Severity:** {severity}")
-                                    st.markdown(f"*   **Confidence:** {confidence}")
-                                    if advice_list:
-                                        st.markdown("*   **Recommendations:**")
-                                        for advice in advice_list: st.markdown(f"    *   {advice}") # Indented list
-                                    if note: st.markdown(f"*   **Note:** {note}")
-                                else: st.caption("No formatted AI analysis available.")
+                    history = symptom_history_state(user["_id"])
+                    if history["entries"]:
+                        st.caption(f"Showing {len(history['entries'])} most recent entr{'y' if len(history['entries']) == 1 else 'ies'}.")
+                        for i, entry in enumerate(history["entries"]): render_symptom_entry(entry, expanded=(i < 2))
+                        if history["cursor"] is not None and st.button("Load more", key="symptom_history_load_more"):
+                            load_symptom_history_page(history); st.rerun()
                     else: st.info("No symptom analysis history found.")
                 except Exception as e: st.error(f"Error retrieving history: {e}", icon="🚨")
 
@@ -669,9 +834,11 @@ def profile_page():
              st.markdown(""" <script> const deleteBtnContainer = window.parent.document.querySelector('button[data-testid="stButton"][key="delete_account_final_button"]').closest('div[data-testid="stButton"]'); if(deleteBtnContainer){ deleteBtnContainer.classList.add('btn-delete-profile'); } </script> """, unsafe_allow_html=True)
              if confirm_delete and user and auth.db is not None:
                  try:
-                     success = auth.db.delete_user_and_data(user["_id"])
+                     progress = st.progress(0.0, text="Deleting your data...")
+                     def show_progress(deleted, total): progress.progress(min(1.0, deleted / total) if total else 1.0, text=f"Deleting your data... {deleted}/{total} records")
+                     success = auth.db.delete_user_and_data(user["_id"], on_progress=show_progress)
                      if success:
-                         st.success("Account deleted successfully.", icon="✅")
+                         st.success(f"Account deleted successfully. Anonymous paper-summary cache entries (shared by identical text, not linked to your account) expire within {Config.SUMMARY_CACHE_MAX_AGE_DAYS:g} days.", icon="✅")
                          st.session_state.user = None
                          st.session_state.page = "Home"
                          st.session_state.scroll_target = None
@@ -695,6 +862,10 @@ def logout():
 
 # --- Main App Logic ---
 def main():
+    # One correlation id per rerun, so the data-layer logs of this page render can be grouped
+    with correlation_scope(str(st.session_state.get("page", "Home")).lower().replace(" ", "_")): render_app()
+
+def render_app():
     load_css() # Apply styles first
 
     page = st.session_state.page
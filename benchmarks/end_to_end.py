@@ -0,0 +1,225 @@
+"""
+End-to-end benchmark suite that runs fully offline, for tracking regressions over time.
+
+Run from the repo root:
+    python -m benchmarks.end_to_end --out bench.json
+    python -m benchmarks.end_to_end --sections wellness login --mongo-uri mongodb://localhost:27017
+
+Models are tiny random-weight stand-ins with the production architectures (BERT classifiers,
+Pegasus summarizer), written once under --models-dir. The database is mongomock unless
+--mongo-uri points at a local mongod (a scratch database is created and dropped). Sections:
+
+    severity  SymptomAnalyzer.get_severity_level latency/throughput at several batch sizes
+    research  ResearchAnalyzer.analyze_research_paper per-stage timings on synthetic PDFs
+    login     Auth.login_user throughput (bcrypt-bound)
+    wellness  dashboard data prep (decode, figures, trend analytics) vs. history size
+
+Absolute numbers only mean something against earlier runs on the same machine.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+import numpy as np  # type: ignore
+from benchmarks.fixtures import bench_database, build_tiny_models, drop_bench_database, synthetic_pdf
+
+SECTIONS = ("severity", "research", "login", "wellness")
+
+
+def latency_stats(seconds):
+    ms = np.asarray(seconds) * 1000
+    return {
+        "n": int(ms.size),
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+    }
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def bench_severity(models, batch_sizes, rounds):
+    """
+    get_severity_level takes one text; a batch of size b is b concurrent callers, which is how
+    sessions share the analyzer in production (bounded by the inference slots).
+    """
+    from benchmarks.inference_concurrency import SAMPLE_SYMPTOMS
+    from utils.symptom_analyzer import SymptomAnalyzer
+    results = {}
+    for tier, kwargs in (("full", {}), ("cascade", {"distilled_model_path": models["distilled_severity"]})):
+        analyzer = SymptomAnalyzer(model_path=models["severity"], **kwargs)
+        analyzer.get_severity_level(SAMPLE_SYMPTOMS[0])  # warm-up
+        levels = []
+        for batch in batch_sizes:
+            latencies = []
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=batch) as pool:
+                for _ in range(rounds):
+                    texts = [SAMPLE_SYMPTOMS[i % len(SAMPLE_SYMPTOMS)] for i in range(batch)]
+                    latencies.extend(t for _, t in pool.map(lambda text: timed(analyzer.get_severity_level, text), texts))
+            wall = time.perf_counter() - start
+            levels.append({"batch_size": batch, "throughput_rps": len(latencies) / wall, **latency_stats(latencies)})
+        results[tier] = {"levels": levels, "cascade": analyzer.get_cascade_stats()}
+    return results
+
+
+def bench_research(models, page_counts, repeats):
+    from utils.research_analyzer import ResearchAnalyzer
+    analyzer = ResearchAnalyzer(
+        classifier_model=models["research_classifier"],
+        summary_model=models["summarizer"],
+        summary_tokenizer=models["summarizer"]
+    )
+    analyzer.summary_cache = None  # repeat runs reuse the same fixed-seed PDFs; time real generation
+    results = []
+    for pages in page_counts:
+        stages = {}
+        for seed in range(repeats):
+            upload = io.BytesIO(synthetic_pdf(pages=pages, seed=seed))
+            upload.name = f"synthetic_{pages}p_{seed}.pdf"
+            analysis, total = timed(analyzer.analyze_research_paper, upload)
+            if "error" in analysis:
+                raise RuntimeError(analysis["error"])
+            for stage, ms in analysis["timings"].items():
+                stages.setdefault(stage, []).append(ms / 1000)
+            stages.setdefault("total_ms", []).append(total)
+        results.append({"pages": pages, "stages": {stage: latency_stats(v) for stage, v in stages.items()}})
+    return results
+
+
+def bench_login(db, users, clients, rounds):
+    from utils.auth import Auth
+    from utils.rate_limit import LoginThrottle, MemoryBucketStore
+    # Every client logs in repeatedly as the same few users; keep the real bucket bookkeeping
+    # in the measurement without ever refusing an attempt
+    unlimited = 10 ** 9
+    auth = Auth(db=db, throttle=LoginThrottle(MemoryBucketStore(), ip_burst=unlimited, ip_per_minute=unlimited,
+                                              email_burst=unlimited, email_per_minute=unlimited))
+    emails = [f"bench{i}@example.com" for i in range(users)]
+    register = [timed(auth.register_user, "Bench User", email, "bench-password", 30, "patient")[1] for email in emails]
+
+    results = {"register": latency_stats(register), "levels": []}
+    for n in clients:
+        latencies = []
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=n) as pool:
+            for (ok, _), t in pool.map(lambda email: timed(auth.login_user, email, "bench-password"), emails * rounds):
+                if not ok:
+                    raise RuntimeError("benchmark login failed")
+                latencies.append(t)
+        wall = time.perf_counter() - start
+        results["levels"].append({"clients": n, "logins_per_s": len(latencies) / wall, **latency_stats(latencies)})
+    return results
+
+
+def bench_wellness(db, history_sizes, tz_name="Asia/Kolkata"):
+    from utils.records import WellnessGoals, WellnessLog, decode_wellness_columns
+    from utils.wellness_analytics import WellnessAnalytics
+    from utils.wellness_tracker import build_progress_figures
+    rng = np.random.default_rng(0)
+    goals = WellnessGoals(sleep_goal=8, water_goal=8, exercise_goal=30)
+    results = []
+    for size in history_sizes:
+        start = datetime.now(timezone.utc) - timedelta(days=size)
+        logs = [
+            WellnessLog(start + timedelta(days=i, hours=int(rng.integers(6, 22))), int(rng.integers(0, 5)),
+                        float(np.clip(rng.normal(7, 1.2), 0, 24)), int(rng.integers(0, 12)), int(rng.integers(0, 90))).to_bson()
+            for i in range(size)
+        ]
+        user_id = str(db.db.users.insert_one({"email": f"wellness{size}@example.com", "wellness_data": logs, "wellness_version": 1}).inserted_id)
+
+        docs, fetch = timed(db.get_user_wellness_logs, user_id)
+        columns, decode = timed(decode_wellness_columns, docs)
+        # A fresh data_version forces a cold build; the second call is the cache hit every rerun gets
+        _, figures_cold = timed(build_progress_figures, db, user_id, f"bench-{size}-{time.time_ns()}", tz_name)
+        version = f"bench-{size}-warm"
+        build_progress_figures(db, user_id, version, tz_name)
+        _, figures_warm = timed(build_progress_figures, db, user_id, version, tz_name)
+
+        analytics, analytics_full = timed(lambda: WellnessAnalytics(goals, tz_name=tz_name).update(columns))
+        new_log = WellnessLog(datetime.now(timezone.utc), 3, 7.5, 8, 30).to_bson()
+        db.save_wellness_log(user_id, WellnessLog.from_bson(new_log))
+        _, analytics_incremental = timed(lambda: analytics.update(decode_wellness_columns([new_log])).summary())
+
+        results.append({
+            "history_size": size,
+            "fetch_ms": fetch * 1000,
+            "decode_ms": decode * 1000,
+            "figures_cold_ms": figures_cold * 1000,
+            "figures_cached_ms": figures_warm * 1000,
+            "analytics_full_ms": analytics_full * 1000,
+            "analytics_incremental_ms": analytics_incremental * 1000,
+        })
+    return results
+
+
+def environment():
+    def version(module):
+        try:
+            return __import__(module).__version__
+        except Exception:
+            return None
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "torch": version("torch"),
+        "transformers": version("transformers"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", nargs="+", choices=SECTIONS, default=list(SECTIONS))
+    parser.add_argument("--models-dir", default=os.path.join("data", "bench_models"))
+    parser.add_argument("--mongo-uri", default=None, help="local mongod to use instead of mongomock")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--rounds", type=int, default=5, help="severity batches / login passes per level")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--pdf-repeats", type=int, default=3)
+    parser.add_argument("--login-users", type=int, default=8)
+    parser.add_argument("--login-clients", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--history-sizes", type=int, nargs="+", default=[30, 365, 3650, 20000])
+    parser.add_argument("--out", default=None, help="write the JSON report here as well as to stdout")
+    args = parser.parse_args()
+
+    report = {"environment": environment(), "results": {}}
+    models = build_tiny_models(args.models_dir) if {"severity", "research"} & set(args.sections) else None
+    db = bench_database(args.mongo_uri) if {"login", "wellness"} & set(args.sections) else None
+    try:
+        if "severity" in args.sections:
+            report["results"]["severity"] = bench_severity(models, args.batch_sizes, args.rounds)
+        if "research" in args.sections:
+            report["results"]["research"] = bench_research(models, args.pages, args.pdf_repeats)
+        if "login" in args.sections:
+            report["results"]["login"] = bench_login(db, args.login_users, args.login_clients, args.rounds)
+        if "wellness" in args.sections:
+            report["results"]["wellness"] = bench_wellness(db, args.history_sizes)
+    finally:
+        if db is not None:
+            drop_bench_database(db)
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Offline stand-ins for the end-to-end benchmarks: tiny random-weight models with the same
+architectures as the production checkpoints, synthetic PDFs, and a throwaway database.
+Nothing here touches the network or the production MongoDB.
+"""
+import os
+import random
+import uuid
+from utils.database import MongoDB
+
+SPECIAL_TOKENS = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+
+WORDS = (
+    "patient patients study trial cohort results methods analysis clinical treatment dose placebo "
+    "randomized controlled outcome outcomes baseline follow-up significant significantly reduced increased "
+    "risk ratio confidence interval mortality symptoms fever cough headache fatigue pain chest blood "
+    "pressure heart rate infection inflammation therapy drug adverse events hospital admission week weeks "
+    "month months year years group groups compared with without among between after before during the "
+    "a an of in on for to and or was were is are be been this that these those we our their it its "
+    "data model models sample samples measured observed primary secondary endpoint endpoints improvement "
+    "severe mild moderate critical chronic acute disease diseases care health medical evidence review "
+    "systematic meta-analysis trials participants age sex women men children adults older higher lower "
+    "mean median standard deviation respectively associated association effect effects response rates"
+).split()
+
+
+def write_vocab(path):
+    os.makedirs(path, exist_ok=True)
+    vocab_file = os.path.join(path, "vocab.txt")
+    with open(vocab_file, "w") as f:
+        f.write("\n".join(SPECIAL_TOKENS + sorted(set(WORDS)) + [".", ","]))
+    return vocab_file
+
+
+def save_tokenizer(path, model_max_length=512):
+    from transformers import BertTokenizerFast  # type: ignore
+    tokenizer = BertTokenizerFast(write_vocab(path), do_lower_case=True, model_max_length=model_max_length)
+    tokenizer.save_pretrained(path)
+    return tokenizer
+
+
+def save_tiny_classifier(path, num_labels=4, hidden_size=32, layers=2, subfolders=False):
+    """
+    BERT-architecture sequence classifier (ClinicalBERT / PubMedBERT shape, random weights).
+    `subfolders` mirrors the tokenizer/ and model/ layout ResearchAnalyzer loads from.
+    """
+    from transformers import BertConfig, BertForSequenceClassification  # type: ignore
+    tokenizer_dir = os.path.join(path, "tokenizer") if subfolders else path
+    model_dir = os.path.join(path, "model") if subfolders else path
+    tokenizer = save_tokenizer(tokenizer_dir)
+    config = BertConfig(
+        vocab_size=tokenizer.vocab_size, hidden_size=hidden_size, num_hidden_layers=layers,
+        num_attention_heads=2, intermediate_size=hidden_size * 2, max_position_embeddings=512, num_labels=num_labels
+    )
+    BertForSequenceClassification(config).save_pretrained(model_dir)
+    return path
+
+
+def save_tiny_summarizer(path, d_model=32, layers=1):
+    """
+    Pegasus-architecture seq2seq model with random weights and a WordPiece tokenizer.
+    """
+    from transformers import PegasusConfig, PegasusForConditionalGeneration  # type: ignore
+    tokenizer = save_tokenizer(path)
+    pad_id, eos_id = tokenizer.pad_token_id, tokenizer.sep_token_id
+    config = PegasusConfig(
+        vocab_size=tokenizer.vocab_size, d_model=d_model, encoder_layers=layers, decoder_layers=layers,
+        encoder_attention_heads=2, decoder_attention_heads=2, encoder_ffn_dim=d_model * 2, decoder_ffn_dim=d_model * 2,
+        max_position_embeddings=512, pad_token_id=pad_id, eos_token_id=eos_id, forced_eos_token_id=eos_id,
+        decoder_start_token_id=pad_id
+    )
+    PegasusForConditionalGeneration(config).save_pretrained(path)
+    return path
+
+
+def build_tiny_models(root):
+    """
+    Writes every stand-in checkpoint under `root` (skipped if already there) and returns their paths.
+    """
+    paths = {
+        "severity": os.path.join(root, "severity"),
+        "distilled_severity": os.path.join(root, "distilled_severity"),
+        "research_classifier": os.path.join(root, "research_classifier"),
+        "summarizer": os.path.join(root, "summarizer"),
+        "draft_summarizer": os.path.join(root, "draft_summarizer"),
+    }
+    if not os.path.exists(os.path.join(paths["severity"], "config.json")):
+        save_tiny_classifier(paths["severity"], hidden_size=64, layers=4)
+    if not os.path.exists(os.path.join(paths["distilled_severity"], "config.json")):
+        save_tiny_classifier(paths["distilled_severity"], hidden_size=32, layers=1)
+    if not os.path.exists(os.path.join(paths["research_classifier"], "model", "config.json")):
+        save_tiny_classifier(paths["research_classifier"], num_labels=2, subfolders=True)
+    if not os.path.exists(os.path.join(paths["summarizer"], "config.json")):
+        save_tiny_summarizer(paths["summarizer"])
+    if not os.path.exists(os.path.join(paths["draft_summarizer"], "config.json")):
+        save_tiny_summarizer(paths["draft_summarizer"], d_model=16)  # same vocabulary, for assisted decoding
+    return paths
+
+
+def synthetic_text(rng, sentences):
+    out = []
+    for _ in range(sentences):
+        words = rng.choices(WORDS, k=rng.randint(8, 28))
+        out.append(" ".join(words).capitalize() + ".")
+    return " ".join(out)
+
+
+def _pdf_escape(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def synthetic_pdf(pages=5, sentences_per_page=40, seed=0):
+    """
+    Minimal valid PDF (Helvetica text, one content stream per page) that PyPDF2 can extract.
+    """
+    rng = random.Random(seed)
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_refs = []
+    for _ in range(pages):
+        text = synthetic_text(rng, sentences_per_page)
+        lines, line = [], ""
+        for word in text.split():
+            if len(line) + len(word) > 95:
+                lines.append(line)
+                line = ""
+            line = f"{line} {word}".strip()
+        lines.append(line)
+        ops = ["BT", "/F1 9 Tf", "11 TL", "40 800 Td"] + [f"({_pdf_escape(l)}) Tj T*" for l in lines[:70]] + ["ET"]
+        stream = "\n".join(ops).encode("latin-1")
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n".encode("latin-1") + stream + b"\nendstream")
+        content_ref = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents {content_ref} 0 R "
+                       f"/Resources << /Font << /F1 3 0 R >> >> >>")
+        page_refs.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(page_refs)}] /Count {pages} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        body = body if isinstance(body, bytes) else body.encode("latin-1")
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def bench_database(mongo_uri=None):
+    """
+    MongoDB wrapper bound to a fresh database: mongomock by default, or a scratch database
+    on a local mongod when `mongo_uri` is given. Drop it with drop_bench_database().
+    """
+    db = MongoDB.__new__(MongoDB)
+    if mongo_uri:
+        from pymongo import MongoClient  # type: ignore
+        db.client = MongoClient(mongo_uri)
+    else:
+        try:
+            import mongomock  # type: ignore
+        except ImportError:
+            raise SystemExit("Install mongomock (pip install mongomock) or pass --mongo-uri of a local mongod")
+        db.client = mongomock.MongoClient()
+    db.db = db.client[f"healthease_bench_{uuid.uuid4().hex[:8]}"]
+    # Index-creation flags are per process; the scratch database starts without indexes
+    MongoDB._research_indexes_ready = False
+    MongoDB._symptom_indexes_ready = False
+    return db
+
+
+def drop_bench_database(db):
+    db.client.drop_database(db.db.name)
@@ -0,0 +1,80 @@
+"""
+Throughput vs. concurrency for SymptomAnalyzer.get_severity_level.
+
+Run from the repo root:
+    python -m benchmarks.inference_concurrency --clients 1 2 4 8 --slots 1 2 4
+
+For every (slots, clients) pair it fires requests from `clients` threads against one
+shared analyzer and prints throughput and latency percentiles, plus the
+escalation rate and per-tier latency when the distilled cascade is enabled.
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np  # type: ignore
+from config.config import Config
+from utils.inference import set_max_concurrent_inferences
+from utils.symptom_analyzer import SymptomAnalyzer
+
+SAMPLE_SYMPTOMS = [
+    "Mild headache since this morning, no fever, slightly tired.",
+    "Persistent dry cough for five days with a low grade fever and fatigue.",
+    "Sharp chest pain spreading to the left arm with sweating and shortness of breath.",
+    "Sore throat and runny nose, otherwise feeling fine.",
+]
+
+
+def run_level(analyzer, clients, requests_per_client):
+    latencies = []
+
+    def worker(worker_id):
+        local = []
+        for i in range(requests_per_client):
+            text = SAMPLE_SYMPTOMS[(worker_id + i) % len(SAMPLE_SYMPTOMS)]
+            start = time.perf_counter()
+            analyzer.get_severity_level(text)
+            local.append(time.perf_counter() - start)
+        return local
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        for result in pool.map(worker, range(clients)):
+            latencies.extend(result)
+    wall = time.perf_counter() - start
+
+    lat_ms = np.array(latencies) * 1000
+    return {
+        "clients": clients,
+        "requests": len(latencies),
+        "throughput_rps": len(latencies) / wall,
+        "p50_ms": float(np.percentile(lat_ms, 50)),
+        "p95_ms": float(np.percentile(lat_ms, 95)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-path", default=Config.SEVERITY_MODEL)
+    parser.add_argument("--distilled-model-path", default=Config.DISTILLED_SEVERITY_MODEL,
+                        help="enable the distilled -> full cascade")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--slots", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=20, help="requests per client")
+    args = parser.parse_args()
+
+    analyzer = SymptomAnalyzer(model_path=args.model_path, distilled_model_path=args.distilled_model_path)
+    analyzer.get_severity_level(SAMPLE_SYMPTOMS[0])  # warm-up
+
+    results = []
+    for slots in args.slots:
+        set_max_concurrent_inferences(slots)
+        for clients in args.clients:
+            row = run_level(analyzer, clients, args.requests)
+            row["slots"] = slots
+            results.append(row)
+    print(json.dumps({"levels": results, "cascade": analyzer.get_cascade_stats()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
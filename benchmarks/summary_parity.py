@@ -0,0 +1,179 @@
+"""
+Quality-parity and latency check for Pegasus decoding presets, runs fully offline.
+
+Run from the repo root:
+    python -m benchmarks.summary_parity --presets greedy beam_fast assisted --out parity.json
+    python -m benchmarks.summary_parity --corpus data/parity_corpus \
+        --summary-model Krishna2908/PegasusXSum --summary-tokenizer Krishna2908/PegasusXSum_tokenizer \
+        --draft-model <small Pegasus checkpoint> --presets assisted
+
+Every document in --corpus (.txt or .pdf files, read in name order) is summarized chunk by
+chunk with the reference "beam" preset and with each candidate preset. Candidates are scored
+with ROUGE-1/2/L F1 against the reference output and timed per chunk. The exit status is 1
+when a candidate's mean ROUGE-L is below --min-rouge-l, so the check can gate a change of
+SUMMARY_DECODING. Without --summary-model the tiny random-weight stand-ins from
+benchmarks.fixtures and a synthetic corpus are used: that exercises the harness and the
+relative latency of the presets, but says nothing about real summary quality.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter
+import numpy as np  # type: ignore
+from config.config import Config
+from benchmarks.end_to_end import environment, latency_stats
+from benchmarks.fixtures import build_tiny_models, synthetic_text
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def _tokens(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def _f1(overlap, candidate_total, reference_total):
+    if not overlap:
+        return 0.0
+    precision, recall = overlap / candidate_total, overlap / reference_total
+    return 2 * precision * recall / (precision + recall)
+
+
+def rouge_n(candidate, reference, n):
+    cand = Counter(zip(*(candidate[i:] for i in range(n))))
+    ref = Counter(zip(*(reference[i:] for i in range(n))))
+    return _f1(sum((cand & ref).values()), sum(cand.values()), sum(ref.values()))
+
+
+def rouge_l(candidate, reference):
+    # Longest common subsequence, one row at a time
+    previous = [0] * (len(reference) + 1)
+    for token in candidate:
+        current = [0]
+        for j, ref_token in enumerate(reference):
+            current.append(previous[j] + 1 if token == ref_token else max(previous[j + 1], current[j]))
+        previous = current
+    return _f1(previous[-1], len(candidate), len(reference))
+
+
+def rouge(candidate, reference):
+    """
+    ROUGE-1/2/L F1 on lowercased word tokens (no stemming); identical texts score 1.0.
+    """
+    cand, ref = _tokens(candidate), _tokens(reference)
+    if not cand and not ref:
+        return {"rouge1": 1.0, "rouge2": 1.0, "rougeL": 1.0}
+    return {"rouge1": rouge_n(cand, ref, 1), "rouge2": rouge_n(cand, ref, 2), "rougeL": rouge_l(cand, ref)}
+
+
+def load_corpus(analyzer, directory, synthetic_docs):
+    """
+    [(name, text)] from .txt/.pdf files in `directory`, or fixed-seed synthetic texts.
+    """
+    if not directory:
+        rng = random.Random(0)
+        return [(f"synthetic_{i}", synthetic_text(rng, 60)) for i in range(synthetic_docs)]
+    corpus = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if name.lower().endswith(".txt"):
+            with open(path, encoding="utf-8") as f:
+                corpus.append((name, analyzer.clean_text(f.read())))
+        elif name.lower().endswith(".pdf"):
+            with open(path, "rb") as f:
+                corpus.append((name, analyzer.clean_text(analyzer.extract_text_from_pdf(f))))
+    return corpus
+
+
+def summarize_corpus(analyzer, corpus, chunk_size, max_chunks, max_length, min_length):
+    """
+    Per-document summaries (chunk summaries joined) and per-chunk generation latencies.
+    """
+    from utils.research_analyzer import chunk_text
+    summaries, latencies = {}, []
+    for name, text in corpus:
+        parts = []
+        for chunk in chunk_text(text, max_length=chunk_size)[:max_chunks]:
+            start = time.perf_counter()
+            parts.extend(analyzer._summarize([chunk], max_length, min_length))
+            latencies.append(time.perf_counter() - start)
+        summaries[name] = " ".join(parts)
+    return summaries, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--presets", nargs="+", default=None, help="candidates compared with 'beam' (default: beam_fast greedy, plus assisted when a draft model is available)")
+    parser.add_argument("--corpus", default=None, help="directory of .txt/.pdf documents (default: synthetic texts)")
+    parser.add_argument("--synthetic-docs", type=int, default=8)
+    parser.add_argument("--models-dir", default=os.path.join("data", "bench_models"))
+    parser.add_argument("--summary-model", default=None, help="default: tiny stand-in from --models-dir")
+    parser.add_argument("--summary-tokenizer", default=None, help="default: --summary-model")
+    parser.add_argument("--draft-model", default=None, help="assistant for the 'assisted' preset")
+    parser.add_argument("--classifier-model", default=None, help="default: tiny stand-in, or Config.RESEARCH_CLASSIFIER_MODEL with --summary-model")
+    parser.add_argument("--chunk-size", type=int, default=1024)
+    parser.add_argument("--max-chunks", type=int, default=2)
+    parser.add_argument("--max-length", type=int, default=250)
+    parser.add_argument("--min-length", type=int, default=120)
+    parser.add_argument("--min-rouge-l", type=float, default=0.9)
+    parser.add_argument("--out", default=None, help="write the JSON report here as well as to stdout")
+    args = parser.parse_args()
+
+    from utils.research_analyzer import DECODING_PRESETS, ResearchAnalyzer
+    # Checked before any model is loaded, so a bad flag never costs a beam reference run
+    has_draft = args.draft_model is not None or args.summary_model is None
+    if args.presets is None:
+        args.presets = ["beam_fast", "greedy"] + (["assisted"] if has_draft else [])
+    unknown = sorted(set(args.presets) - set(DECODING_PRESETS))
+    if unknown:
+        parser.error(f"unknown presets {unknown}; choose from {sorted(DECODING_PRESETS)}")
+    if "assisted" in args.presets and not has_draft:
+        parser.error("the 'assisted' preset needs --draft-model when --summary-model is given")
+    if args.summary_model is None:
+        models = build_tiny_models(args.models_dir)
+        summary_model, classifier_model = models["summarizer"], args.classifier_model or models["research_classifier"]
+        draft_model = args.draft_model or models["draft_summarizer"]
+    else:
+        summary_model, classifier_model = args.summary_model, args.classifier_model or Config.RESEARCH_CLASSIFIER_MODEL
+        draft_model = args.draft_model
+    analyzer = ResearchAnalyzer(classifier_model=classifier_model, summary_model=summary_model,
+                                summary_tokenizer=args.summary_tokenizer or summary_model, decoding="beam")
+    analyzer.summary_cache = None  # every chunk must actually be generated
+    corpus = load_corpus(analyzer, args.corpus, args.synthetic_docs)
+    lengths = dict(chunk_size=args.chunk_size, max_chunks=args.max_chunks, max_length=args.max_length, min_length=args.min_length)
+
+    report = {"environment": environment(), "corpus": [name for name, _ in corpus], "settings": lengths, "presets": {}}
+    passed = True
+    reference = None
+    for preset in ["beam"] + [p for p in args.presets if p != "beam"]:
+        analyzer.set_decoding(preset, draft_model)
+        summarize_corpus(analyzer, corpus[:1], args.chunk_size, 1, args.max_length, args.min_length)  # warm-up
+        summaries, latencies = summarize_corpus(analyzer, corpus, **lengths)
+        result = {"latency": latency_stats(latencies), "total_s": float(np.sum(latencies))}
+        if reference is None:
+            reference = result
+            reference["summaries"] = summaries
+        else:
+            scores = [rouge(summaries[name], reference["summaries"][name]) for name, _ in corpus]
+            result["rouge"] = {metric: {"mean": float(np.mean([s[metric] for s in scores])), "min": float(np.min([s[metric] for s in scores]))}
+                               for metric in ("rouge1", "rouge2", "rougeL")}
+            result["speedup"] = reference["total_s"] / result["total_s"] if result["total_s"] else None
+            result["passed"] = result["rouge"]["rougeL"]["mean"] >= args.min_rouge_l
+            passed = passed and result["passed"]
+        report["presets"][preset] = result
+    reference.pop("summaries")
+    report["passed"] = passed
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output)
+    print(output)
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,11 +10,23 @@ class Config:
     
     PUBMEDBERT_MODEL = "microsoft/BiomedNLP-PubMedBERT-base-uncased-abstract-fulltext"
     CLINICALBERT_MODEL = "emilyalsentzer/Bio_ClinicalBERT"
+    SEVERITY_MODEL = "Krishna2908/clinicalbert_finetuned"
+    # Optional small classifier (same four severity labels) tried before SEVERITY_MODEL.
+    # Requests it is unsure about (below MIN_CONFIDENCE_THRESHOLD) escalate to the full model.
+    DISTILLED_SEVERITY_MODEL = st.secrets.get('DISTILLED_SEVERITY_MODEL')
     MEDICAL_NER_MODEL = "samrawal/bert-base-uncased_clinical-ner"
     QA_MODEL = "deepset/roberta-base-squad2"
     ZERO_SHOT_MODEL = "facebook/bart-large-mnli"
     TEXT_GENERATION_MODEL = "./models/PegasusXSum"
     TEXT_GENERATION_TOKENIZER = "./models/PegasusXSum_tokenizer"
+    RESEARCH_CLASSIFIER_MODEL = "Krishna2908/pubmedbert_hf"
+    SUMMARY_MODEL = "Krishna2908/PegasusXSum"
+    SUMMARY_TOKENIZER = "Krishna2908/PegasusXSum_tokenizer"
+    # Pegasus decoding preset (utils/research_analyzer.py DECODING_PRESETS): "beam" (reference),
+    # "beam_fast", "greedy", or "assisted" (greedy drafted by SUMMARY_DRAFT_MODEL, a small seq2seq
+    # model sharing the Pegasus tokenizer). Check parity first: python -m benchmarks.summary_parity
+    SUMMARY_DECODING = st.secrets.get('SUMMARY_DECODING', 'beam')
+    SUMMARY_DRAFT_MODEL = st.secrets.get('SUMMARY_DRAFT_MODEL')
     
     SECRET_KEY = st.secrets.get('SECRET_KEY')
     
@@ -26,9 +38,91 @@ class Config:
         'users': 'users',
         'health_records': 'health_records',
         'research_history': 'research_history',
-        'wellness_data': 'wellness_data'
+        'wellness_data': 'wellness_data',
+        'wellness_goals': 'wellness_goals',
+        'symptom_history': 'symptom_history',
+        'rate_limits': 'rate_limits',
+        'account_deletions': 'account_deletions'
     }
     
     
+    # Memory-mapped float16 embedding matrices for "similar papers" / "similar past reports"
+    EMBEDDING_INDEX_DIR = st.secrets.get('EMBEDDING_INDEX_DIR', 'data/embeddings')
+
+    # Longer wellness series are LTTB-downsampled to this many points before charting
+    WELLNESS_CHART_MAX_POINTS = 500
+    # A day is flagged when a metric sits this many standard deviations from the user's history,
+    # once at least WELLNESS_ANOMALY_MIN_DAYS earlier days exist
+    WELLNESS_ANOMALY_Z = 2.5
+    WELLNESS_ANOMALY_MIN_DAYS = 14
+
+    # Prometheus-style /metrics endpoint (utils/metrics.py); unset METRICS_PORT disables it.
+    # OTEL_TRACING also emits OpenTelemetry spans when opentelemetry-api is installed.
+    METRICS_PORT = st.secrets.get('METRICS_PORT')
+    METRICS_HOST = st.secrets.get('METRICS_HOST', '127.0.0.1')
+    OTEL_TRACING = bool(st.secrets.get('OTEL_TRACING', False))
+
+    # Structured logs (utils/structured_logging.py); DEBUG records are kept at this sample rate
+    LOG_LEVEL = st.secrets.get('LOG_LEVEL', 'INFO')
+    LOG_DEBUG_SAMPLE_RATE = float(st.secrets.get('LOG_DEBUG_SAMPLE_RATE', 0.01))
+
+    # Opt-in profiling of slow requests (utils/profiling.py); reports go to PROFILE_DIR
+    PROFILING_ENABLED = bool(st.secrets.get('PROFILING_ENABLED', False))
+    PROFILE_TORCH = bool(st.secrets.get('PROFILE_TORCH', False))
+    PROFILE_TRACEMALLOC = bool(st.secrets.get('PROFILE_TRACEMALLOC', False))
+    PROFILE_THRESHOLD_MS = float(st.secrets.get('PROFILE_THRESHOLD_MS', 5000))
+    PROFILE_FORWARD_THRESHOLD_MS = float(st.secrets.get('PROFILE_FORWARD_THRESHOLD_MS', 1000))
+    PROFILE_DIR = st.secrets.get('PROFILE_DIR', 'data/profiles')
+    PROFILE_MAX_REPORTS = int(st.secrets.get('PROFILE_MAX_REPORTS', 50))
+
+    # Profile page loads symptom history this many entries at a time ("Load more")
+    SYMPTOM_HISTORY_PAGE_SIZE = 10
+
     MAX_TEXT_LENGTH = 1024
-    MIN_CONFIDENCE_THRESHOLD = 0.7
\ No newline at end of file
+    MIN_CONFIDENCE_THRESHOLD = 0.7
+    # Estimated Jaccard similarity (word bigram MinHash) above which summary sentences count as repeats
+    NEAR_DUPLICATE_THRESHOLD = 0.5
+
+    # Inference concurrency policy: every Streamlit session shares one process,
+    # so concurrent forward passes split the CPU instead of each grabbing every core.
+    MAX_CONCURRENT_INFERENCES = int(st.secrets.get('MAX_CONCURRENT_INFERENCES', 2))
+    INFERENCE_NUM_THREADS = int(st.secrets.get(
+        'INFERENCE_NUM_THREADS', max(1, (os.cpu_count() or 1) // MAX_CONCURRENT_INFERENCES)
+    ))
+    INFERENCE_INTEROP_THREADS = int(st.secrets.get('INFERENCE_INTEROP_THREADS', 1))
+
+    # Batch research analysis: chunks from several papers share one generate() call
+    SUMMARY_BATCH_SIZE = int(st.secrets.get('SUMMARY_BATCH_SIZE', 4))
+    PDF_EXTRACTION_WORKERS = int(st.secrets.get('PDF_EXTRACTION_WORKERS', 4))
+
+    # Admission control for whole analyses (utils/admission.py): at most MAX_ACTIVE_ANALYSES run,
+    # MAX_QUEUED_ANALYSES more wait up to ADMISSION_TIMEOUT_S seconds, the rest are told to retry
+    MAX_ACTIVE_ANALYSES = int(st.secrets.get('MAX_ACTIVE_ANALYSES', 2 * MAX_CONCURRENT_INFERENCES))
+    MAX_QUEUED_ANALYSES = int(st.secrets.get('MAX_QUEUED_ANALYSES', 16))
+    ADMISSION_TIMEOUT_S = float(st.secrets.get('ADMISSION_TIMEOUT_S', 60))
+
+    # Login throttling (utils/rate_limit.py), checked before any bcrypt work. Buckets hold `BURST`
+    # attempts and refill at `PER_MINUTE`; a failed password costs LOGIN_FAILURE_COST extra tokens.
+    # "mongo" shares the buckets between processes, "memory" keeps them per process.
+    LOGIN_RATE_LIMIT_STORE = st.secrets.get('LOGIN_RATE_LIMIT_STORE', 'memory')
+    # Reverse proxies (IPs or CIDRs) whose X-Forwarded-For is believed; from anyone else it is ignored
+    TRUSTED_PROXIES = st.secrets.get('TRUSTED_PROXIES', [])
+    LOGIN_IP_BURST = int(st.secrets.get('LOGIN_IP_BURST', 20))
+    LOGIN_IP_PER_MINUTE = float(st.secrets.get('LOGIN_IP_PER_MINUTE', 10))
+    LOGIN_EMAIL_BURST = int(st.secrets.get('LOGIN_EMAIL_BURST', 5))
+    LOGIN_EMAIL_PER_MINUTE = float(st.secrets.get('LOGIN_EMAIL_PER_MINUTE', 2))
+    LOGIN_FAILURE_COST = int(st.secrets.get('LOGIN_FAILURE_COST', 2))
+
+    # Account deletion jobs (utils/account_deletion.py): documents removed per delete_many,
+    # and how many collections are swept in parallel
+    DELETION_BATCH_SIZE = int(st.secrets.get('DELETION_BATCH_SIZE', 1000))
+    DELETION_WORKERS = int(st.secrets.get('DELETION_WORKERS', 4))
+
+    # Chunk summary cache (utils/summary_cache.py): an in-process LRU of this many chunk summaries
+    # in front of a directory shared by all processes; an empty SUMMARY_CACHE_DIR keeps it in memory only
+    SUMMARY_CACHE_ENABLED = bool(st.secrets.get('SUMMARY_CACHE_ENABLED', True))
+    SUMMARY_CACHE_DIR = st.secrets.get('SUMMARY_CACHE_DIR', 'data/summary_cache')
+    SUMMARY_CACHE_MEMORY_ITEMS = int(st.secrets.get('SUMMARY_CACHE_MEMORY_ITEMS', 4096))
+    # Disk entries expire after this many days; beyond SUMMARY_CACHE_MAX_MB the oldest are removed
+    SUMMARY_CACHE_MAX_MB = float(st.secrets.get('SUMMARY_CACHE_MAX_MB', 256))
+    SUMMARY_CACHE_MAX_AGE_DAYS = float(st.secrets.get('SUMMARY_CACHE_MAX_AGE_DAYS', 30))
@@ -0,0 +1,174 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from bson import ObjectId  # type: ignore
+from bson.errors import InvalidId  # type: ignore
+from pymongo import ReturnDocument  # type: ignore
+from config.config import Config
+from utils.metrics import REGISTRY
+from utils.semantic_index import RESEARCH_INDEX, SYMPTOM_INDEX, tombstone_owner
+from utils.structured_logging import get_logger, fields
+
+log = get_logger(__name__)
+
+DELETED_DOCS = REGISTRY.counter("healthease_account_deletion_docs_total", "Documents removed by account deletion jobs", labels=("collection",))
+DELETION_JOBS = REGISTRY.counter("healthease_account_deletion_jobs_total", "Account deletion jobs by outcome", labels=("state",))
+
+# Collections holding documents owned by one user through a `user_id` field. Names not written
+# to today are swept too, so split-out history collections never leave orphans.
+USER_COLLECTIONS = ("symptom_history", "research_history", "wellness_goals", "wellness_data", "health_records")
+
+# deleting_data -> deleting_user -> verifying -> done; any error or leftover document -> failed.
+# Running a failed or interrupted job again resumes from the first collection not yet swept.
+STATES = ("deleting_data", "deleting_user", "verifying", "done", "failed")
+
+
+def _user_ids(user_id):
+    """
+    user_id is stored as a string in newer documents and as an ObjectId in some older ones.
+    """
+    try:
+        return [str(user_id), ObjectId(str(user_id))]
+    except InvalidId:
+        return [str(user_id)]
+
+
+class AccountDeletion:
+    """
+    Removes one user's data from every collection as a job whose state lives in the
+    `account_deletions` collection. Child collections are swept in parallel in batches of
+    `batch_size` ids (short delete_many calls instead of one long one); the user's embedding
+    rows are tombstoned (hidden at once, purged by EmbeddingIndex.compact()) and the user
+    document goes last, so an interrupted job can always be resumed by running it again.
+    Completed jobs keep only ids, timestamps and per-collection counts.
+    """
+
+    def __init__(self, db, batch_size=None, workers=None):
+        self.db = db
+        self.batch_size = batch_size or Config.DELETION_BATCH_SIZE
+        self.workers = workers or Config.DELETION_WORKERS
+        self.jobs = db[Config.COLLECTIONS['account_deletions']]
+
+    def _steps(self, user_id, email):
+        owned = {"user_id": {"$in": _user_ids(user_id)}}
+        steps = [(Config.COLLECTIONS[name], owned) for name in USER_COLLECTIONS]
+        if email:
+            steps.append((Config.COLLECTIONS['rate_limits'], {"_id": f"email:{email.strip().lower()}"}))
+        return steps
+
+    def _user_filter(self, user_id):
+        return {"_id": {"$in": _user_ids(user_id)}}
+
+    def _update(self, user_id, update):
+        update.setdefault("$set", {})["updated_at"] = datetime.now(timezone.utc)
+        return self.jobs.find_one_and_update({"_id": str(user_id)}, update, return_document=ReturnDocument.AFTER)
+
+    def start(self, user_id):
+        """
+        Creates the job, or reopens an unfinished one. Returns the job document.
+        """
+        user = self.db[Config.COLLECTIONS['users']].find_one(self._user_filter(user_id), {"email": 1})
+        now = datetime.now(timezone.utc)
+        job = self.jobs.find_one_and_update(
+            {"_id": str(user_id)},
+            {"$setOnInsert": {"state": "deleting_data", "created_at": now, "progress": {},
+                              "email": user.get("email") if user else None},
+             "$set": {"updated_at": now}, "$inc": {"attempts": 1}},
+            upsert=True, return_document=ReturnDocument.AFTER
+        )
+        if job["state"] == "failed":
+            job = self._update(user_id, {"$set": {"state": "deleting_data"}, "$unset": {"error": ""}})
+        return job
+
+    def _sweep(self, user_id, collection_name, query, counters):
+        """
+        Deletes matching documents `batch_size` ids at a time, recording progress after each batch.
+        """
+        collection = self.db[collection_name]
+        key = f"progress.{collection_name}"
+        deleted = counters[collection_name]["deleted"]
+        counters[collection_name]["total"] = deleted + collection.count_documents(query)
+        self._update(user_id, {"$set": {f"{key}.total": counters[collection_name]["total"]}})
+        while True:
+            ids = [doc["_id"] for doc in collection.find(query, {"_id": 1}).limit(self.batch_size)]
+            if not ids:
+                break
+            removed = collection.delete_many({"_id": {"$in": ids}}).deleted_count
+            DELETED_DOCS.inc(removed, collection=collection_name)
+            counters[collection_name]["deleted"] += removed
+            self._update(user_id, {"$inc": {f"{key}.deleted": removed}})
+        self._update(user_id, {"$set": {f"{key}.done": True}})
+
+    def _delete_data(self, user_id, job, on_progress, poll_interval):
+        pending = [(name, query) for name, query in self._steps(user_id, job.get("email"))
+                   if not job["progress"].get(name, {}).get("done")]
+        counters = {name: {"deleted": job["progress"].get(name, {}).get("deleted", 0), "total": 0} for name, _ in pending}
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="account-deletion") as pool:
+            futures = [pool.submit(self._sweep, user_id, name, query, counters) for name, query in pending]
+            last = None
+            while True:
+                finished, running = wait(futures, timeout=poll_interval)
+                # on_progress runs here, in the caller's thread (Streamlit elements can't be
+                # updated from pool threads)
+                current = (sum(c["deleted"] for c in counters.values()), sum(c["total"] for c in counters.values()))
+                if on_progress is not None and current != last:
+                    on_progress(*current)
+                    last = current
+                if not running:
+                    break
+        for future in futures:
+            future.result()  # re-raise the first failure
+
+    def verify(self, user_id, email=None):
+        """
+        Documents still owned by the user, per collection (all zero after a successful job).
+        """
+        counts = {name: self.db[name].count_documents(query) for name, query in self._steps(user_id, email)}
+        counts[Config.COLLECTIONS['users']] = self.db[Config.COLLECTIONS['users']].count_documents(self._user_filter(user_id))
+        return counts
+
+    def run(self, user_id, on_progress=None, poll_interval=0.2):
+        """
+        Runs (or resumes) the job to completion. `on_progress(deleted, total)` reports child
+        documents removed so far. Returns the final job document; its state is "done" or "failed".
+        """
+        job = self.start(user_id)
+        if job["state"] == "done":
+            return job
+        start = time.perf_counter()
+        try:
+            if job["state"] == "deleting_data":
+                self._delete_data(user_id, job, on_progress, poll_interval)
+                job = self._update(user_id, {"$set": {"state": "deleting_user"}})
+            if job["state"] == "deleting_user":
+                for index_name in (RESEARCH_INDEX, SYMPTOM_INDEX):
+                    tombstone_owner(Config.EMBEDDING_INDEX_DIR, index_name, str(user_id))
+                self.db[Config.COLLECTIONS['users']].delete_many(self._user_filter(user_id))
+                job = self._update(user_id, {"$set": {"state": "verifying"}})
+            remaining = self.verify(user_id, job.get("email"))
+            leftover = {name: count for name, count in remaining.items() if count}
+            if leftover:
+                # e.g. a write that raced the sweep; running the job again picks these up
+                reopen = {f"progress.{name}.done": False for name in leftover}
+                job = self._update(user_id, {"$set": {"state": "failed", "remaining": remaining,
+                                                      "error": "Documents remained after deletion", **reopen}})
+            else:
+                job = self._update(user_id, {"$set": {"state": "done", "remaining": remaining,
+                                                      "completed_at": datetime.now(timezone.utc)},
+                                             "$unset": {"email": ""}})
+        except Exception as e:
+            job = self._update(user_id, {"$set": {"state": "failed", "error": str(e)}})
+            log.error("Account deletion failed", extra=fields(user_id=str(user_id), error=str(e)))
+        DELETION_JOBS.inc(state=job["state"])
+        log.info("Account deletion finished", extra=fields(
+            user_id=str(user_id), state=job["state"], attempts=job.get("attempts"),
+            deleted={name: p.get("deleted", 0) for name, p in job.get("progress", {}).items()},
+            elapsed_s=round(time.perf_counter() - start, 2)
+        ))
+        return job
+
+    def resume_incomplete(self):
+        """
+        Re-runs every job that was interrupted or failed. Returns {user_id: final state}.
+        """
+        return {job["_id"]: self.run(job["_id"])["state"] for job in self.jobs.find({"state": {"$ne": "done"}}, {"_id": 1})}
@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from config.config import Config
+from utils.metrics import REGISTRY
+from utils.structured_logging import get_logger, fields
+
+log = get_logger(__name__)
+
+ADMISSION_ACTIVE = REGISTRY.gauge("healthease_admission_active", "Admitted requests currently running", labels=("pool",))
+ADMISSION_QUEUED = REGISTRY.gauge("healthease_admission_queued", "Requests waiting for admission", labels=("pool",))
+ADMISSION_WAIT = REGISTRY.histogram("healthease_admission_wait_seconds", "Time spent queued before admission", labels=("pool",))
+ADMISSION_REJECTED = REGISTRY.counter("healthease_admission_rejected_total", "Requests shed instead of run", labels=("pool", "reason"))
+
+
+class ServerBusy(Exception):
+    """
+    Raised instead of running a request: the wait queue is full ("queue_full") or the
+    request's deadline passed while queued ("timeout"). `retry_after` is a hint in seconds.
+    """
+
+    def __init__(self, reason, retry_after):
+        super().__init__(f"Server busy ({reason}); retry in about {retry_after:.0f}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Bounds how many model-heavy requests run at once (each holds documents, tensors and
+    generation state, not just a forward pass). Extra requests wait in a bounded FIFO queue
+    until a slot frees up or their deadline passes; beyond that they are shed with ServerBusy.
+    """
+
+    def __init__(self, max_active, max_queue, timeout, name="analysis"):
+        self.max_active = max(1, int(max_active))
+        self.max_queue = max(0, int(max_queue))
+        self.timeout = timeout
+        self.name = name
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = deque()
+        self._service_s = 1.0  # moving average of how long an admitted request holds its slot
+
+    def retry_after(self):
+        return max(1.0, self._service_s * (len(self._waiting) + 1) / self.max_active)
+
+    def _reject(self, reason):
+        ADMISSION_REJECTED.inc(pool=self.name, reason=reason)
+        log.warning("Request shed", extra=fields(pool=self.name, reason=reason, queued=len(self._waiting), active=self._active))
+        raise ServerBusy(reason, self.retry_after())
+
+    def _publish(self):
+        ADMISSION_ACTIVE.set(self._active, pool=self.name)
+        ADMISSION_QUEUED.set(len(self._waiting), pool=self.name)
+
+    def _wait_for_slot(self, timeout, on_wait, poll_interval):
+        deadline = time.monotonic() + timeout
+        ticket = object()
+        with self._cond:
+            if self._active < self.max_active and not self._waiting:
+                self._active += 1
+                self._publish()
+                return
+            if len(self._waiting) >= self.max_queue:
+                self._reject("queue_full")
+            self._waiting.append(ticket)
+            self._publish()
+        last_position = None
+        try:
+            while True:
+                with self._cond:
+                    if self._waiting[0] is ticket and self._active < self.max_active:
+                        self._waiting.popleft()
+                        self._active += 1
+                        self._publish()
+                        self._cond.notify_all()  # the next ticket is now at the front
+                        return
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._reject("timeout")
+                    position = self._waiting.index(ticket) + 1
+                # The callback (e.g. a Streamlit placeholder update) runs without holding the lock
+                if on_wait is not None and position != last_position:
+                    on_wait(position)
+                    last_position = position
+                with self._cond:
+                    self._cond.wait(min(remaining, poll_interval))
+        except BaseException:
+            # Timeout, a failing on_wait, or Streamlit aborting the script run (StopException and
+            # RerunException are BaseExceptions): give up the ticket so it cannot block the queue
+            with self._cond:
+                if ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                    self._publish()
+                    self._cond.notify_all()
+            raise
+
+    @contextmanager
+    def admit(self, timeout=None, on_wait=None, poll_interval=0.5):
+        """
+        Holds one slot for the enclosed block. `on_wait(position)` is called whenever the
+        caller's 1-based queue position changes. Raises ServerBusy if the request is shed.
+        """
+        start = time.perf_counter()
+        self._wait_for_slot(self.timeout if timeout is None else timeout, on_wait, poll_interval)
+        admitted = time.perf_counter()
+        ADMISSION_WAIT.observe(admitted - start, pool=self.name)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._service_s = 0.8 * self._service_s + 0.2 * (time.perf_counter() - admitted)
+                self._publish()
+                self._cond.notify_all()
+
+    def snapshot(self):
+        with self._cond:
+            return {"active": self._active, "queued": len(self._waiting), "max_active": self.max_active, "max_queue": self.max_queue}
+
+
+# Shared by every Streamlit session and API worker thread in this process
+ANALYSIS_ADMISSION = AdmissionController(
+    Config.MAX_ACTIVE_ANALYSES, Config.MAX_QUEUED_ANALYSES, Config.ADMISSION_TIMEOUT_S, name="analysis"
+)
@@ -3,22 +3,31 @@ import jwt  # type: ignore
 from datetime import datetime, timedelta
 from config.config import Config
 from utils.database import MongoDB
+from utils.metrics import instrument
+from utils.rate_limit import get_login_throttle
+from utils.structured_logging import get_logger, fields
+
+log = get_logger(__name__)
 
 class Auth:
-    def __init__(self):
-        self.db = MongoDB()
+    def __init__(self, db=None, throttle=None):
+        self.db = db if db is not None else MongoDB()
+        self.throttle = throttle or get_login_throttle()
     
     @staticmethod
+    @instrument("bcrypt_hash")
     def hashed_password(password: str) -> str:
         salt = bcrypt.gensalt()
         return bcrypt.hashpw(password.encode(), salt).decode()  # Store as a string
 
     @staticmethod
+    @instrument("bcrypt_check")
     def verify_password(password: str, hashed_password: str) -> bool:
         return bcrypt.checkpw(password.encode(), hashed_password.encode() if isinstance(hashed_password, str) else hashed_password)
     
     def check_password(self, password, hashed_password):
-        return bcrypt.checkpw(password.encode('utf-8'), hashed_password)
+        # Hashes are stored as strings (see hashed_password); older records may hold bytes
+        return self.verify_password(password, hashed_password)
     
     def generate_token(self, user_id):
         payload = {
@@ -46,7 +55,7 @@ class Auth:
         }
 
         if role not in role_mapping:
-            print(f"❌ Invalid role received: {role}")  # Debugging
+            log.warning("Invalid role received", extra=fields(role=role))
             return False, "Invalid role selected"
 
         normalized_role = role_mapping[role]  # Convert to expected format
@@ -69,12 +78,17 @@ class Auth:
 
 
     
-    def login_user(self, email, password):
+    def login_user(self, email, password, ip=None):
+        # Raises LoginThrottled before the user lookup and bcrypt check
+        throttle = self.throttle
+        throttle.check(email, ip)
         user = self.db.get_user(email)
         if not user:
+            throttle.record_failure(email)
             return False, "User not found"
         
         if not self.check_password(password, user['password']):
+            throttle.record_failure(email)
             return False, "Invalid password"
         
         token = self.generate_token(user['_id'])
@@ -90,14 +104,18 @@ class Auth:
 
 
 # ✅ Added the missing function below
-def check_authentication(email, password):
+def check_authentication(email, password, ip=None):
+    throttle = get_login_throttle()
+    throttle.check(email, ip)  # Raises LoginThrottled
     db = MongoDB()  # ✅ Initialize MongoDB instance
     user = db.get_user(email)  
 
     if not user:
+        throttle.record_failure(email)
         return None  # User doesn't exist
 
     if not Auth.verify_password(password, user["password"]):
+        throttle.record_failure(email)
         return None  # Incorrect password
 
     user["_id"] = str(user["_id"])  # Convert ObjectId to string
@@ -0,0 +1,77 @@
+"""
+Cohort-level wellness and symptom trends computed from the Parquet export
+(see utils/wellness_export.py). Reads only local files, never the production database.
+
+    python -m utils.cohort_analytics exports --metric sleep_hours
+"""
+import argparse
+import os
+import pandas as pd  # type: ignore
+import pyarrow.dataset as ds  # type: ignore
+
+WELLNESS_METRICS = ("sleep_hours", "water_glasses", "exercise_minutes")
+
+
+def load_dataset(export_dir, name, columns, since=None):
+    """
+    Reads only the requested columns; `since` (a Timestamp) prunes whole year/month partitions.
+    """
+    dataset = ds.dataset(os.path.join(export_dir, name), format="parquet", partitioning="hive")
+    condition = None
+    if since is not None:
+        since = pd.Timestamp(since, tz="UTC")
+        condition = (ds.field("year") > since.year) | ((ds.field("year") == since.year) & (ds.field("month") >= since.month))
+    return dataset.to_table(columns=list(columns), filter=condition).to_pandas()
+
+
+def weekly_trends(export_dir, since=None):
+    """
+    Mean of each wellness metric per calendar week across all users, with active-user counts.
+    """
+    df = load_dataset(export_dir, "wellness", ("user", "timestamp") + WELLNESS_METRICS, since)
+    if df.empty:
+        return df
+    weekly = df.groupby(pd.Grouper(key="timestamp", freq="W"))
+    trends = weekly[list(WELLNESS_METRICS)].mean()
+    trends["active_users"] = weekly["user"].nunique()
+    return trends.dropna(how="all", subset=list(WELLNESS_METRICS))
+
+
+def cohort_trends(export_dir, metric="sleep_hours", since=None):
+    """
+    Users grouped by the month of their first log (cohort); rows are cohorts, columns are
+    months since joining, values are the cohort's mean `metric`.
+    """
+    df = load_dataset(export_dir, "wellness", ("user", "timestamp", metric), since)
+    if df.empty:
+        return df
+    month = df["timestamp"].dt.tz_localize(None).dt.to_period("M")
+    cohort = month.groupby(df["user"]).transform("min")
+    df = df.assign(cohort=cohort, months_since_joining=(month - cohort).apply(lambda offset: offset.n))
+    return df.pivot_table(index="cohort", columns="months_since_joining", values=metric, aggfunc="mean")
+
+
+def severity_by_month(export_dir, since=None):
+    """
+    Share of each severity level among symptom analyses, per month.
+    """
+    df = load_dataset(export_dir, "symptoms", ("timestamp", "severity"), since)
+    if df.empty:
+        return df
+    month = df["timestamp"].dt.tz_localize(None).dt.to_period("M")
+    return pd.crosstab(month, df["severity"], normalize="index")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("export_dir")
+    parser.add_argument("--metric", default="sleep_hours", choices=WELLNESS_METRICS)
+    parser.add_argument("--since", default=None, help="ISO date; skips older partitions")
+    args = parser.parse_args()
+    print("Weekly trends:\n", weekly_trends(args.export_dir, args.since).tail(12))
+    print(f"\nCohort trends ({args.metric}):\n", cohort_trends(args.export_dir, args.metric, args.since))
+    print("\nSeverity mix by month:\n", severity_by_month(args.export_dir, args.since))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,22 @@
-from pymongo import MongoClient  # type: ignore
+from pymongo import MongoClient, ASCENDING, DESCENDING, TEXT, UpdateOne  # type: ignore
 from config.config import Config
 from datetime import datetime, timezone
 from bson import ObjectId  # type: ignore  
+from utils.records import WellnessLog, SymptomEntry
+from utils.account_deletion import AccountDeletion
+from utils.metrics import REGISTRY, instrument_methods
+from utils.structured_logging import get_logger, fields
 
+log = get_logger(__name__)
+
+DB_SECONDS = REGISTRY.histogram("healthease_db_seconds", "Latency of MongoDB wrapper calls", labels=("method",))
+DB_ERRORS = REGISTRY.counter("healthease_db_errors_total", "MongoDB wrapper calls that raised", labels=("method",))
+
+@instrument_methods(DB_SECONDS, DB_ERRORS, exclude=("get_database",))
 class MongoDB:
+    _research_indexes_ready = False
+    _symptom_indexes_ready = False
+
     def __init__(self):
         try:
             if not Config.MONGODB_URI:
@@ -13,19 +26,19 @@ class MongoDB:
             self.db = self.client.get_database(Config.DB_NAME) if self.client else None
 
             if self.db is not None:
-                print("✅ Connected to MongoDB")
+                log.debug("Connected to MongoDB")  # every MongoDB() construction; sampled
             else:
-                print("❌ Failed to connect to MongoDB")
+                log.error("Failed to connect to MongoDB")
         except Exception as e:
             self.db = None
-            print(f"❌ Error connecting to MongoDB: {e}")
+            log.error("Error connecting to MongoDB", extra=fields(error=str(e)))
 
     def get_database(self):
         return self.db
 
     def create_user(self, user_data):
         if self.db is None:
-            print("⚠️ Database connection not established!")
+            log.warning("Database connection not established")
             return None
 
         try:
@@ -44,26 +57,42 @@ class MongoDB:
 
             valid_roles = {"doctor", "researcher", "patient"}
             if "role" not in user_data or user_data["role"] not in valid_roles:
-                print(f"❌ Invalid role: {user_data.get('role', 'None')}")
+                log.warning("Invalid role", extra=fields(role=user_data.get('role')))
                 return None
 
             result = users.insert_one(user_data)
-            print(f"✅ User {user_data['email']} registered successfully with role {user_data['role']}")
+            log.info("User registered", extra=fields(user_id=str(result.inserted_id), role=user_data['role']))
             return result
         except Exception as e:
-            print(f"❌ Error creating user: {e}")
+            log.error("Error creating user", extra=fields(error=str(e)))
             return None
 
 
     def get_user(self, email):
         if self.db is None:
-            print("⚠️ Database connection not established!")
+            log.warning("Database connection not established")
             return None
         return self.db.users.find_one({"email": email})
 
+    def is_active_user(self, user_id):
+        """
+        False once the user is gone or an account deletion job has been opened for them; the job
+        is written before any data is swept, so tokens stop working before orphans can appear.
+        """
+        if self.db is None:
+            log.warning("Database connection not established")
+            return False
+        try:
+            if self.db.users.find_one({"_id": ObjectId(user_id)}, {"_id": 1}) is None:
+                return False
+            return self.db[Config.COLLECTIONS['account_deletions']].find_one({"_id": str(user_id)}, {"_id": 1}) is None
+        except Exception as e:
+            log.error("Error checking user status", extra=fields(user_id=str(user_id), error=str(e)))
+            return False
+
     def update_health_record(self, user_id, record):
         if self.db is None:
-            print("⚠️ Database connection not established!")
+            log.warning("Database connection not established")
             return None
         try:
             record['timestamp'] = datetime.now(timezone.utc)
@@ -72,26 +101,79 @@ class MongoDB:
                 {"$push": {"health_records": record}}
             )
         except Exception as e:
-            print(f"❌ Error updating health record: {e}")
+            log.error("Error updating health record", extra=fields(error=str(e)))
             return None
 
+    def _research_collection(self):
+        collection = self.db[Config.COLLECTIONS['research_history']]
+        if not MongoDB._research_indexes_ready:
+            # Idempotent; done once per process rather than on every connect
+            collection.create_index([("user_id", ASCENDING), ("content_hash", ASCENDING), ("model_version", ASCENDING)])
+            collection.create_index([("user_id", ASCENDING), ("timestamp", DESCENDING)])
+            collection.create_index(
+                [("file_name", TEXT), ("summary", TEXT), ("key_points", TEXT)],
+                weights={"file_name": 5, "key_points": 2, "summary": 1},
+                name="research_text_search"
+            )
+            MongoDB._research_indexes_ready = True
+        return collection
+
     def save_research_analysis(self, user_id, analysis):
+        """
+        Stores one analysis (summary, key points, content_hash, model_version, timings) per document.
+        """
         if self.db is None:
-            print("⚠️ Database connection not established!")
+            log.warning("Database connection not established")
             return None
         try:
-            analysis['timestamp'] = datetime.now(timezone.utc)
-            return self.db.users.update_one(
-                {"_id": ObjectId(user_id)},
-                {"$push": {"research_history": analysis}}
+            record = {**analysis, "user_id": user_id, "timestamp": datetime.now(timezone.utc)}
+            record.pop("preview", None)
+            return self._research_collection().insert_one(record)
+        except Exception as e:
+            log.error("Error saving research analysis", extra=fields(error=str(e)))
+            return None
+
+    def find_research_analysis(self, user_id, content_hash, model_version):
+        """
+        Latest stored analysis of the same file by the same model, or None.
+        """
+        if self.db is None:
+            log.warning("Database connection not established")
+            return None
+        try:
+            return self._research_collection().find_one(
+                {"user_id": user_id, "content_hash": content_hash, "model_version": model_version},
+                sort=[("timestamp", DESCENDING)]
             )
         except Exception as e:
-            print(f"❌ Error saving research analysis: {e}")
+            log.error("Error finding research analysis", extra=fields(error=str(e)))
             return None
 
+    def search_research_analyses(self, user_id, query, limit=20):
+        """
+        Full-text search over the user's stored summaries, key points and file names,
+        best matches first. An empty query returns the most recent analyses.
+        """
+        if self.db is None:
+            log.warning("Database connection not established")
+            return []
+        try:
+            collection = self._research_collection()
+            if not query or not query.strip():
+                return list(collection.find({"user_id": user_id}).sort("timestamp", DESCENDING).limit(limit))
+            return list(
+                collection.find(
+                    {"user_id": user_id, "$text": {"$search": query}},
+                    {"score": {"$meta": "textScore"}}
+                ).sort([("score", {"$meta": "textScore"})]).limit(limit)
+            )
+        except Exception as e:
+            log.error("Error searching research analyses", extra=fields(error=str(e)))
+            return []
+
     def save_wellness_data(self, user_id, data):
         if self.db is None:
-            print("⚠️ Database connection not established!")
+            log.warning("Database connection not established")
             return None
         try:
             data['timestamp'] = datetime.now(timezone.utc)
@@ -100,24 +182,109 @@ class MongoDB:
                 {"$push": {"wellness_data": data}}
             )
         except Exception as e:
-            print(f"❌ Error saving wellness data: {e}")
+            log.error("Error saving wellness data", extra=fields(error=str(e)))
+            return None
+
+    def save_wellness_log(self, user_id, entry):
+        """
+        Appends a WellnessLog in its canonical encoding (native datetime, numeric mood code).
+        """
+        if self.db is None:
+            log.warning("Database connection not established")
+            return None
+        try:
+            # wellness_version lets readers cache anything derived from the logs
+            return self.db.users.update_one(
+                {"_id": ObjectId(user_id)},
+                {"$push": {"wellness_data": entry.to_bson()}, "$inc": {"wellness_version": 1}}
+            )
+        except Exception as e:
+            log.error("Error saving wellness log", extra=fields(error=str(e)))
+            return None
+
+    def get_wellness_version(self, user_id):
+        """
+        Counter bumped on every wellness write; cheap to read (single-field projection).
+        """
+        if self.db is None:
+            log.warning("Database connection not established")
+            return None
+        user = self.db.users.find_one({"_id": ObjectId(user_id)}, {"wellness_version": 1})
+        return user.get("wellness_version", 0) if user else 0
+
+    def get_user_wellness_logs(self, user_id):
+        """
+        Daily log entries only; goal entries from older versions are filtered out.
+        """
+        if self.db is None:
+            log.warning("Database connection not established")
+            return None
+        user = self.db.users.find_one({"_id": ObjectId(user_id)}, {"wellness_data": 1})
+        return [entry for entry in user.get('wellness_data', []) if WellnessLog.is_log(entry)] if user else []
+
+    def get_wellness_logs_since(self, user_id, since=None):
+        """
+        Daily logs newer than `since` (a UTC datetime); the array is filtered on the server,
+        so incremental readers only transfer the new entries. `since=None` returns every log.
+        """
+        if since is None:
+            return self.get_user_wellness_logs(user_id)
+        if self.db is None:
+            log.warning("Database connection not established")
+            return []
+        try:
+            pipeline = [
+                {"$match": {"_id": ObjectId(user_id)}},
+                {"$project": {"wellness_data": {"$filter": {
+                    "input": {"$ifNull": ["$wellness_data", []]},
+                    "cond": {"$gt": ["$$this.timestamp", since]}
+                }}}}
+            ]
+            user = next(self.db.users.aggregate(pipeline), None)
+            return [entry for entry in user.get('wellness_data', []) if WellnessLog.is_log(entry)] if user else []
+        except Exception as e:
+            log.error("Error retrieving wellness logs", extra=fields(error=str(e)))
+            return []
+
+    def save_wellness_goals(self, user_id, goals):
+        """
+        Goals are their own documents, one per update; the latest one is current.
+        """
+        if self.db is None:
+            log.warning("Database connection not established")
+            return None
+        try:
+            return self.db[Config.COLLECTIONS['wellness_goals']].insert_one({"user_id": user_id, **goals.to_bson()})
+        except Exception as e:
+            log.error("Error saving wellness goals", extra=fields(error=str(e)))
+            return None
+
+    def get_latest_wellness_goals(self, user_id):
+        if self.db is None:
+            log.warning("Database connection not established")
+            return None
+        try:
+            return self.db[Config.COLLECTIONS['wellness_goals']].find_one({"user_id": user_id}, sort=[("date_set", DESCENDING)])
+        except Exception as e:
+            log.error("Error retrieving wellness goals", extra=fields(error=str(e)))
             return None
 
     def delete_wellness_data(self, user_id):
         try:
             result = self.db.users.update_one(
                 {"_id": ObjectId(user_id)},
-                {"$set": {"wellness_data": []}}
+                {"$set": {"wellness_data": []}, "$inc": {"wellness_version": 1}}
             )
-            print(f"Deleted wellness data for user {user_id}")
+            self.db[Config.COLLECTIONS['wellness_goals']].delete_many({"user_id": user_id})
+            log.info("Deleted wellness data", extra=fields(user_id=user_id))
             return result.modified_count > 0
         except Exception as e:
-            print(f"Error deleting wellness data for user {user_id}: {e}")
+            log.error("Error deleting wellness data", extra=fields(user_id=user_id, error=str(e)))
             return False
 
     def save_symptom_analysis(self, user_id, analysis_data):
         if self.db is None:
-            print("⚠️ Database connection not established!")
+            log.warning("Database connection not established")
             return None
         try:
             analysis_record = {
@@ -130,12 +297,12 @@ class MongoDB:
                 {"$push": {"symptom_history": analysis_record}}
             )
         except Exception as e:
-            print(f"❌ Error saving symptom analysis: {e}")
+            log.error("Error saving symptom analysis", extra=fields(error=str(e)))
             return None
 
     def save_symptom_history(self, user_id, history_data):
         if self.db is None:
-            print("⚠️ Database connection not established!")
+            log.warning("Database connection not established")
             return None
         try:
             return self.db["symptom_history"].insert_one({
@@ -143,47 +310,138 @@ class MongoDB:
                 **history_data
             })
         except Exception as e:
-            print(f"❌ Error saving symptom history: {e}")
+            log.error("Error saving symptom history", extra=fields(error=str(e)))
             return None
 
+    def _symptom_collection(self):
+        collection = self.db["symptom_history"]
+        if not MongoDB._symptom_indexes_ready:
+            # Serves both the per-user history pages and their (timestamp, _id) cursor
+            collection.create_index([("user_id", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)])
+            MongoDB._symptom_indexes_ready = True
+        return collection
+
+    def get_symptom_history_page(self, user_id, limit=10, before=None):
+        """
+        Newest-first page of the user's symptom history. `before` is the cursor returned with the
+        previous page, a (timestamp, _id) pair, so each page is a bounded index range scan rather
+        than a skip. Returns (documents, next_cursor); next_cursor is None on the last page.
+        """
+        if self.db is None:
+            log.warning("Database connection not established")
+            return [], None
+        try:
+            query = {"user_id": user_id}
+            if before is not None:
+                timestamp, last_id = before
+                query["$or"] = [{"timestamp": {"$lt": timestamp}}, {"timestamp": timestamp, "_id": {"$lt": last_id}}]
+            docs = list(
+                self._symptom_collection().find(query)
+                .sort([("timestamp", DESCENDING), ("_id", DESCENDING)])
+                .limit(limit + 1)
+            )
+            if len(docs) <= limit:
+                return docs, None
+            docs = docs[:limit]
+            return docs, (docs[-1]["timestamp"], docs[-1]["_id"])
+        except Exception as e:
+            log.error("Error retrieving symptom history", extra=fields(error=str(e)))
+            return [], None
+
+    def normalize_symptom_history(self, user_id=None, batch_size=500):
+        """
+        Rewrites legacy entries (analyzer output nested under `recommendation`, often as a JSON
+        string, with ISO string timestamps) into the canonical SymptomEntry shape, so pages sort
+        by a real date and render without re-parsing. Pass user_id=None to migrate everyone.
+        Returns the number of documents rewritten.
+        """
+        if self.db is None:
+            log.warning("Database connection not established")
+            return 0
+        query = {"severity": {"$exists": False}}
+        if user_id is not None:
+            query["user_id"] = user_id
+        rewritten, batch = 0, []
+        try:
+            for doc in self.db["symptom_history"].find(query, batch_size=batch_size):
+                try:
+                    entry = SymptomEntry.from_bson(doc)
+                except (KeyError, TypeError, ValueError):
+                    continue
+                batch.append(UpdateOne(
+                    {"_id": doc["_id"]},
+                    {"$set": entry.to_bson(), "$unset": {"recommendation": ""}}
+                ))
+                if len(batch) >= batch_size:
+                    rewritten += self.db["symptom_history"].bulk_write(batch, ordered=False).modified_count
+                    batch = []
+            if batch:
+                rewritten += self.db["symptom_history"].bulk_write(batch, ordered=False).modified_count
+            return rewritten
+        except Exception as e:
+            log.error("Error normalizing symptom history", extra=fields(error=str(e)))
+            return rewritten
+
     def get_symptom_history(self, user_id):
         if self.db is None:
-            print("⚠️ Database connection not established!")
+            log.warning("Database connection not established")
             return []
         try:
             return list(self.db["symptom_history"].find({"user_id": user_id}))
         except Exception as e:
-            print(f"❌ Error retrieving symptom history: {e}")
+            log.error("Error retrieving symptom history", extra=fields(error=str(e)))
+            return []
+
+    def get_symptom_history_by_ids(self, user_id, history_ids):
+        return self._find_owned_by_ids(self.db["symptom_history"] if self.db is not None else None, user_id, history_ids)
+
+    def get_research_analyses_by_ids(self, user_id, analysis_ids):
+        return self._find_owned_by_ids(self._research_collection() if self.db is not None else None, user_id, analysis_ids)
+
+    def _find_owned_by_ids(self, collection, user_id, ids):
+        """
+        Fetches the user's documents for ids returned by a similarity search, keeping the search order.
+        """
+        if collection is None:
+            log.warning("Database connection not established")
+            return []
+        try:
+            object_ids = [ObjectId(i) for i in ids]
+            docs = {doc["_id"]: doc for doc in collection.find({"_id": {"$in": object_ids}, "user_id": user_id})}
+            return [docs[oid] for oid in object_ids if oid in docs]
+        except Exception as e:
+            log.error("Error retrieving documents by id", extra=fields(error=str(e)))
             return []
 
     def get_user_health_history(self, user_id):
         if self.db is None:
-            print("⚠️ Database connection not established!")
+            log.warning("Database connection not established")
             return None
         user = self.db.users.find_one({"_id": ObjectId(user_id)})
         return user.get('health_records', []) if user else []
 
-    def get_user_research_history(self, user_id):
+    def get_user_research_history(self, user_id, limit=50):
         if self.db is None:
-            print("⚠️ Database connection not established!")
+            log.warning("Database connection not established")
             return None
-        user = self.db.users.find_one({"_id": ObjectId(user_id)})
-        return user.get('research_history', []) if user else []
+        return self.search_research_analyses(user_id, "", limit=limit)
 
     def get_user_wellness_data(self, user_id):
         if self.db is None:
-            print("⚠️ Database connection not established!")
+            log.warning("Database connection not established")
             return None
         user = self.db.users.find_one({"_id": ObjectId(user_id)})
         return user.get('wellness_data', []) if user else []
 
-    def delete_user_and_data(self, user_id):
+    def delete_user_and_data(self, user_id, on_progress=None):
+        """
+        Runs (or resumes) the account deletion job; True once verification finds nothing left.
+        """
+        if self.db is None:
+            log.warning("Database connection not established")
+            return False
         try:
-            self.db["users"].delete_one({"_id": ObjectId(user_id)})
-            self.db["symptom_history"].delete_many({"user_id": user_id})
-            self.db["wellness"].delete_many({"user_id": user_id})
-            print(f"✅ Deleted user and related data for {user_id}")
-            return True
+            return AccountDeletion(self.db).run(user_id, on_progress=on_progress)["state"] == "done"
         except Exception as e:
-            print(f"❌ Error deleting user and data: {e}")
+            log.error("Error deleting user and data", extra=fields(user_id=str(user_id), error=str(e)))
             return False
@@ -0,0 +1,63 @@
+import threading
+from contextlib import contextmanager
+import torch  # type: ignore
+from config.config import Config
+from utils.profiling import torch_profile
+
+_config_lock = threading.Lock()
+_threads_configured = False
+_inference_slots = threading.BoundedSemaphore(Config.MAX_CONCURRENT_INFERENCES)
+
+
+def configure_torch_threads(num_threads=None, interop_threads=None):
+    """
+    Applies the per-process torch thread budget once. Safe to call from every analyzer.
+    """
+    global _threads_configured
+    with _config_lock:
+        if _threads_configured:
+            return
+        torch.set_num_threads(num_threads or Config.INFERENCE_NUM_THREADS)
+        try:
+            torch.set_num_interop_threads(interop_threads or Config.INFERENCE_INTEROP_THREADS)
+        except RuntimeError:
+            # Interop threads can only be set before the first parallel op runs.
+            pass
+        _threads_configured = True
+
+
+def set_max_concurrent_inferences(max_concurrent):
+    """
+    Replaces the forward-pass semaphore. Meant for benchmarks sweeping slot counts,
+    not for use while requests are in flight.
+    """
+    global _inference_slots
+    _inference_slots = threading.BoundedSemaphore(max(1, int(max_concurrent)))
+
+
+@contextmanager
+def inference_slot(name="forward"):
+    """
+    Runs the enclosed forward pass under the shared concurrency policy:
+    waits for a free slot, then disables autograd tracking with inference_mode.
+    `name` labels the torch profiler report when PROFILE_TORCH is on.
+    """
+    configure_torch_threads()
+    slots = _inference_slots
+    with slots:
+        with torch.inference_mode(), torch_profile(name):
+            yield
+
+
+def embed_texts(tokenizer, model, texts, max_length=256):
+    """
+    Mean-pooled last hidden states from an already loaded encoder (or classifier wrapping one),
+    returned as a float32 NumPy array of shape (len(texts), hidden_size).
+    """
+    inputs = tokenizer(texts, return_tensors="pt", padding=True, truncation=True, max_length=max_length)
+    with inference_slot("embed"):
+        outputs = model(**inputs, output_hidden_states=True)
+        hidden = outputs.hidden_states[-1]
+        mask = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+        pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+    return pooled.float().numpy()
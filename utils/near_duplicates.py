@@ -0,0 +1,85 @@
+import re
+import zlib
+import numpy as np  # type: ignore
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def _lsh_params(num_perm, threshold):
+    """
+    Picks (bands, rows) with bands * rows == num_perm whose S-curve midpoint
+    (1 / bands) ** (1 / rows) is closest to the requested threshold.
+    """
+    options = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    return min(options, key=lambda br: abs((1 / br[0]) ** (1 / br[1]) - threshold))
+
+
+class MinHasher:
+    """
+    MinHash signatures over word shingles, computed for a whole batch of sentences with NumPy.
+    """
+
+    def __init__(self, num_perm=64, shingle_size=2, seed=1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.a = rng.randint(1, 1 << 61, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, 1 << 61, size=num_perm, dtype=np.uint64)
+
+    def shingle_hashes(self, text):
+        tokens = _TOKEN_PATTERN.findall(text.lower())
+        if len(tokens) < self.shingle_size:
+            shingles = [" ".join(tokens)] if tokens else []
+        else:
+            shingles = [" ".join(tokens[i:i + self.shingle_size]) for i in range(len(tokens) - self.shingle_size + 1)]
+        return [zlib.crc32(s.encode()) for s in set(shingles)]
+
+    def signatures(self, texts):
+        """
+        Returns a (len(texts), num_perm) uint64 matrix. Texts without any tokens get an
+        all-max signature and never match anything.
+        """
+        per_text = [self.shingle_hashes(t) for t in texts]
+        signatures = np.full((len(texts), self.num_perm), _MAX_HASH, dtype=np.uint64)
+        non_empty = [i for i, h in enumerate(per_text) if h]
+        if not non_empty:
+            return signatures
+        hashes = np.fromiter((h for i in non_empty for h in per_text[i]), dtype=np.uint64)
+        offsets = np.cumsum([0] + [len(per_text[i]) for i in non_empty[:-1]])
+        # Universal hashing (a * x + b) mod p, overflow of the uint64 product is tolerated as in datasketch
+        permuted = np.bitwise_and((hashes[:, None] * self.a + self.b) % _MERSENNE_PRIME, _MAX_HASH)
+        signatures[non_empty] = np.minimum.reduceat(permuted, offsets, axis=0)
+        return signatures
+
+
+def filter_near_duplicates(sentences, threshold=0.5, num_perm=64, shingle_size=2):
+    """
+    Keeps the first sentence of every group whose estimated Jaccard similarity is at or
+    above `threshold`. LSH banding makes this linear in the number of sentences; only
+    bucket collisions are compared signature to signature.
+    """
+    if len(sentences) < 2:
+        return list(sentences)
+    hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+    signatures = hasher.signatures(sentences)
+    empty = np.all(signatures == _MAX_HASH, axis=1)
+    bands, rows = _lsh_params(num_perm, threshold)
+    buckets = [{} for _ in range(bands)]
+
+    kept = []
+    for i, sig in enumerate(signatures):
+        if empty[i]:
+            kept.append(i)
+            continue
+        keys = [sig[band * rows:(band + 1) * rows].tobytes() for band in range(bands)]
+        candidates = set()
+        for band, key in enumerate(keys):
+            candidates.update(buckets[band].get(key, ()))
+        if any(np.mean(signatures[c] == sig) >= threshold for c in candidates):
+            continue
+        kept.append(i)
+        for band, key in enumerate(keys):
+            buckets[band].setdefault(key, []).append(i)
+    return [sentences[i] for i in kept]
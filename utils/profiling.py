@@ -0,0 +1,153 @@
+"""
+Opt-in profiling for slow analyzer requests. Everything here is a no-op unless enabled in
+secrets.toml:
+
+    PROFILING_ENABLED      profile whole requests (pyinstrument if installed, else cProfile) and
+                           keep a report when one takes longer than PROFILE_THRESHOLD_MS
+    PROFILE_TORCH          capture torch.profiler operator tables for forward passes slower than
+                           PROFILE_FORWARD_THRESHOLD_MS
+    PROFILE_TRACEMALLOC    tracemalloc snapshot diff around PDF extraction
+
+Reports are text files in PROFILE_DIR; only the newest PROFILE_MAX_REPORTS are kept.
+"""
+import cProfile
+import functools
+import io
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from config.config import Config
+from utils.structured_logging import get_logger, fields
+
+try:
+    from pyinstrument import Profiler as SamplingProfiler  # type: ignore
+except ImportError:
+    SamplingProfiler = None
+
+log = get_logger(__name__)
+
+# Profilers hook the interpreter (or torch's profiler) globally, so each hook profiles one
+# block at a time; concurrent requests / forward passes simply run unprofiled.
+_request_lock = threading.Lock()
+_memory_lock = threading.Lock()
+_torch_lock = threading.Lock()
+_write_lock = threading.Lock()
+
+
+def store_report(kind, name, elapsed_ms, text, directory=None, max_reports=None):
+    """
+    Writes one report and prunes the oldest ones beyond the retention limit. Returns the path.
+    """
+    directory = directory or Config.PROFILE_DIR
+    max_reports = max_reports or Config.PROFILE_MAX_REPORTS
+    safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", name)[:60]
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    path = os.path.join(directory, f"{stamp}-{kind}-{safe_name}-{elapsed_ms:.0f}ms.txt")
+    with _write_lock:
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        reports = sorted(os.path.join(directory, entry) for entry in os.listdir(directory) if entry.endswith(".txt"))
+        for old in reports[:max(0, len(reports) - max_reports)]:
+            os.remove(old)
+    log.info("Profile report stored", extra=fields(kind=kind, name=name, elapsed_ms=round(elapsed_ms, 1), path=path))
+    return path
+
+
+@contextmanager
+def profile_request(name, threshold_ms=None):
+    """
+    Profiles the enclosed request and stores a report if it ran longer than the threshold.
+    Only the calling thread is sampled; forward passes on worker threads are covered by torch_profile.
+    """
+    if not Config.PROFILING_ENABLED or not _request_lock.acquire(blocking=False):
+        yield
+        return
+    threshold_ms = Config.PROFILE_THRESHOLD_MS if threshold_ms is None else threshold_ms
+    profiler = SamplingProfiler() if SamplingProfiler is not None else cProfile.Profile()
+    start = time.perf_counter()
+    try:
+        profiler.enable() if isinstance(profiler, cProfile.Profile) else profiler.start()
+        try:
+            yield
+        finally:
+            profiler.disable() if isinstance(profiler, cProfile.Profile) else profiler.stop()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms >= threshold_ms:
+            if isinstance(profiler, cProfile.Profile):
+                out = io.StringIO()
+                pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(60)
+                text = out.getvalue()
+            else:
+                text = profiler.output_text(unicode=True, color=False)
+            store_report("request", name, elapsed_ms, text)
+    finally:
+        _request_lock.release()
+
+
+def profiled(name, threshold_ms=None):
+    """
+    Decorator form of profile_request().
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with profile_request(name, threshold_ms):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def torch_profile(name="forward", threshold_ms=None):
+    """
+    Records operator-level timings for one forward pass / generate call; kept only when slow.
+    """
+    if not Config.PROFILE_TORCH or not _torch_lock.acquire(blocking=False):
+        yield
+        return
+    try:
+        import torch  # type: ignore
+        threshold_ms = Config.PROFILE_FORWARD_THRESHOLD_MS if threshold_ms is None else threshold_ms
+        start = time.perf_counter()
+        with torch.profiler.profile(activities=[torch.profiler.ProfilerActivity.CPU], record_shapes=True) as prof:
+            yield
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms >= threshold_ms:
+            table = prof.key_averages(group_by_input_shape=True).table(sort_by="cpu_time_total", row_limit=40)
+            store_report("torch", name, elapsed_ms, table)
+    finally:
+        _torch_lock.release()
+
+
+@contextmanager
+def trace_memory(name, top=25):
+    """
+    tracemalloc snapshot diff around the block (e.g. PDF extraction), with the traced peak.
+    """
+    if not Config.PROFILE_TRACEMALLOC or not _memory_lock.acquire(blocking=False):
+        yield
+        return
+    started_here = not tracemalloc.is_tracing()
+    try:
+        if started_here:
+            tracemalloc.start(10)
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        start = time.perf_counter()
+        yield
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        lines = [f"peak traced memory: {peak / 2 ** 20:.1f} MiB", f"top {top} allocation sites by growth:"]
+        lines += [str(stat) for stat in after.compare_to(before, "lineno")[:top]]
+        store_report("memory", name, elapsed_ms, "\n".join(lines))
+    finally:
+        if started_here:
+            tracemalloc.stop()
+        _memory_lock.release()
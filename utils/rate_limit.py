@@ -0,0 +1,190 @@
+import ipaddress
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import lru_cache
+from pymongo import ReturnDocument  # type: ignore
+from pymongo.errors import DuplicateKeyError, PyMongoError  # type: ignore
+from config.config import Config
+from utils.metrics import REGISTRY
+from utils.structured_logging import get_logger, fields
+
+log = get_logger(__name__)
+
+THROTTLED = REGISTRY.counter("healthease_login_throttled_total", "Login attempts refused before password checks", labels=("scope",))
+
+
+class LoginThrottled(Exception):
+    def __init__(self, retry_after, scope):
+        super().__init__(f"Too many login attempts. Please try again in {math.ceil(retry_after)} seconds.")
+        self.retry_after = retry_after
+        self.scope = scope
+
+
+def _trusted_networks(proxies):
+    if isinstance(proxies, str):
+        proxies = proxies.split(",")
+    return [ipaddress.ip_network(p.strip(), strict=False) for p in proxies or () if p.strip()]
+
+
+def _is_trusted(address, networks):
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+
+def client_address(peer, forwarded_for=None, trusted_proxies=None):
+    """
+    The address to throttle by. X-Forwarded-For is client-controlled, so it is only read when
+    the direct peer is one of TRUSTED_PROXIES (IPs or CIDRs), and then the right-most hop not
+    added by a trusted proxy is used. Otherwise the peer itself is the client.
+    """
+    networks = _trusted_networks(Config.TRUSTED_PROXIES if trusted_proxies is None else trusted_proxies)
+    if not peer or not forwarded_for or not _is_trusted(peer, networks):
+        return peer
+    hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted(hop, networks):
+            return hop
+    return hops[0] if hops else peer
+
+
+class MemoryBucketStore:
+    """
+    Token buckets for one process. Keys are kept in least-recently-used order, so idle keys
+    (whose buckets have refilled anyway) fall off the end once `max_keys` is reached: memory
+    stays bounded under a spray of random emails / IPs and every operation is O(1).
+    """
+
+    def __init__(self, max_keys=100_000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> [tokens, last_refill_monotonic]
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, rate, cost=1):
+        """
+        Refills at `rate` tokens/second up to `capacity`, then tries to spend `cost`.
+        Returns (allowed, retry_after_seconds).
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [capacity, now]
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+            if bucket[0] >= cost:
+                bucket[0] -= cost
+                return True, 0.0
+            return False, (cost - bucket[0]) / rate
+
+
+class MongoBucketStore:
+    """
+    The same token buckets shared by every process through one Mongo collection. Each take is a
+    single atomic find_one_and_update with an aggregation-pipeline update (refill + spend), keyed
+    by _id; a TTL index drops buckets idle for a day.
+
+    Fails open: if Mongo errors, the attempt is allowed and logged. Logins need the same
+    database for the user lookup anyway, and bcrypt still stands behind the throttle.
+    """
+
+    def __init__(self, collection, idle_ttl_s=24 * 60 * 60):
+        self.collection = collection
+        collection.create_index("updated_at", expireAfterSeconds=idle_ttl_s)
+
+    def take(self, key, capacity, rate, cost=1):
+        try:
+            try:
+                doc = self._take(key, capacity, rate, cost)
+            except DuplicateKeyError:
+                # Two first attempts for one key both tried to insert it; the loser now updates it
+                doc = self._take(key, capacity, rate, cost)
+        except PyMongoError as e:
+            log.error("Rate-limit store unavailable, allowing attempt", extra=fields(error=str(e)))
+            return True, 0.0
+        if doc["allowed"]:
+            return True, 0.0
+        return False, (cost - doc["tokens"]) / rate
+
+    def _take(self, key, capacity, rate, cost):
+        now = datetime.now(timezone.utc)
+        elapsed_s = {"$divide": [{"$subtract": [now, {"$ifNull": ["$updated_at", now]}]}, 1000]}
+        refilled = {"$min": [capacity, {"$add": [{"$ifNull": ["$tokens", capacity]}, {"$multiply": [elapsed_s, rate]}]}]}
+        return self.collection.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {"tokens": refilled, "updated_at": now}},
+                {"$set": {"allowed": {"$gte": ["$tokens", cost]}}},
+                {"$set": {"tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", cost]}, "$tokens"]}}},
+            ],
+            upsert=True, return_document=ReturnDocument.AFTER
+        )
+
+
+class LoginThrottle:
+    """
+    Per-IP and per-email token buckets checked before any bcrypt work. Every attempt spends one
+    token from each bucket; a failed password spends `failure_cost` more from the email's
+    bucket, so guessing drains it much faster than a user mistyping once.
+    """
+
+    def __init__(self, store, ip_burst=Config.LOGIN_IP_BURST, ip_per_minute=Config.LOGIN_IP_PER_MINUTE,
+                 email_burst=Config.LOGIN_EMAIL_BURST, email_per_minute=Config.LOGIN_EMAIL_PER_MINUTE,
+                 failure_cost=Config.LOGIN_FAILURE_COST):
+        self.store = store
+        self.ip_limit = (ip_burst, ip_per_minute / 60)
+        self.email_limit = (email_burst, email_per_minute / 60)
+        self.failure_cost = failure_cost
+
+    @staticmethod
+    def _email_key(email):
+        return f"email:{(email or '').strip().lower()}"
+
+    def check(self, email, ip=None):
+        """
+        Spends one attempt; raises LoginThrottled when either bucket is empty.
+        """
+        checks = [("email", self._email_key(email), self.email_limit)]
+        if ip:
+            checks.insert(0, ("ip", f"ip:{ip}", self.ip_limit))
+        for scope, key, (capacity, rate) in checks:
+            allowed, retry_after = self.store.take(key, capacity, rate)
+            if not allowed:
+                THROTTLED.inc(scope=scope)
+                log.warning("Login throttled", extra=fields(scope=scope, retry_after=round(retry_after, 1)))
+                raise LoginThrottled(retry_after, scope)
+
+    def record_failure(self, email):
+        capacity, rate = self.email_limit
+        # One token at a time so a nearly empty bucket is drained rather than left untouched
+        for _ in range(self.failure_cost):
+            if not self.store.take(self._email_key(email), capacity, rate)[0]:
+                break
+
+
+@lru_cache(maxsize=None)
+def get_login_throttle():
+    """
+    Process-wide throttle; LOGIN_RATE_LIMIT_STORE = "mongo" shares buckets across processes.
+    """
+    if Config.LOGIN_RATE_LIMIT_STORE == "mongo":
+        from utils.database import MongoDB
+        db = MongoDB().get_database()
+        if db is not None:
+            try:
+                return LoginThrottle(MongoBucketStore(db[Config.COLLECTIONS['rate_limits']]))
+            except PyMongoError as e:
+                # Fail open like take(): an unreachable store must not take logins down with it
+                log.error("Mongo rate-limit store setup failed, using in-memory buckets", extra=fields(error=str(e)))
+        else:
+            log.warning("Mongo rate-limit store unavailable, using in-memory buckets")
+    return LoginThrottle(MemoryBucketStore())
@@ -0,0 +1,202 @@
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import numpy as np  # type: ignore
+
+# Stored as an index into this scale; the emoji is only a display concern
+MOOD_SCALE = ("😔", "😐", "🙂", "😊", "🤗")
+
+
+def to_utc(value):
+    """
+    Accepts a datetime or an ISO-8601 string (legacy documents) and returns an aware UTC datetime.
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if not isinstance(value, datetime):
+        raise ValueError(f"Invalid timestamp: {value!r}")
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _check_range(name, value, low, high):
+    if not low <= value <= high:
+        raise ValueError(f"{name} must be between {low} and {high}, got {value}")
+
+
+@dataclass(slots=True)
+class WellnessLog:
+    timestamp: datetime
+    mood_code: int
+    sleep_hours: float
+    water_glasses: int
+    exercise_minutes: int
+
+    def __post_init__(self):
+        self.timestamp = to_utc(self.timestamp)
+        _check_range("mood_code", self.mood_code, 0, len(MOOD_SCALE) - 1)
+        _check_range("sleep_hours", self.sleep_hours, 0, 24)
+        _check_range("water_glasses", self.water_glasses, 0, 20)
+        _check_range("exercise_minutes", self.exercise_minutes, 0, 300)
+
+    @property
+    def mood(self):
+        return MOOD_SCALE[self.mood_code]
+
+    def to_bson(self):
+        return {
+            "timestamp": self.timestamp,
+            "mood_code": self.mood_code,
+            "sleep_hours": float(self.sleep_hours),
+            "water_glasses": int(self.water_glasses),
+            "exercise_minutes": int(self.exercise_minutes)
+        }
+
+    @classmethod
+    def from_bson(cls, doc):
+        """
+        Decodes canonical documents and legacy ones (emoji `mood`, ISO string timestamps).
+        """
+        mood_code = doc.get("mood_code")
+        if mood_code is None:
+            mood_code = MOOD_SCALE.index(doc["mood"])
+        return cls(
+            timestamp=doc["timestamp"],
+            mood_code=int(mood_code),
+            sleep_hours=float(doc.get("sleep_hours", 0)),
+            water_glasses=int(doc.get("water_glasses", 0)),
+            exercise_minutes=int(doc.get("exercise_minutes", 0))
+        )
+
+    @staticmethod
+    def is_log(doc):
+        return "mood_code" in doc or "mood" in doc
+
+
+@dataclass(slots=True)
+class WellnessGoals:
+    sleep_goal: float
+    water_goal: int
+    exercise_goal: int
+    date_set: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    def __post_init__(self):
+        self.date_set = to_utc(self.date_set)
+        _check_range("sleep_goal", self.sleep_goal, 1, 12)
+        _check_range("water_goal", self.water_goal, 1, 20)
+        _check_range("exercise_goal", self.exercise_goal, 1, 300)
+
+    def to_bson(self):
+        return {
+            "sleep_goal": float(self.sleep_goal),
+            "water_goal": int(self.water_goal),
+            "exercise_goal": int(self.exercise_goal),
+            "date_set": self.date_set
+        }
+
+    @classmethod
+    def from_bson(cls, doc):
+        doc = doc.get("goals", doc)  # legacy entries wrapped goals inside wellness_data
+        return cls(
+            sleep_goal=float(doc["sleep_goal"]),
+            water_goal=int(doc["water_goal"]),
+            exercise_goal=int(doc["exercise_goal"]),
+            date_set=doc.get("date_set", datetime.now(timezone.utc))
+        )
+
+
+@dataclass(slots=True)
+class SymptomEntry:
+    timestamp: datetime
+    symptoms: str
+    severity: str = "N/A"
+    confidence: float = None
+    recommendations: list = field(default_factory=list)
+    note: str = ""
+
+    def __post_init__(self):
+        self.timestamp = to_utc(self.timestamp)
+
+    def to_bson(self):
+        return {
+            "timestamp": self.timestamp,
+            "symptoms": self.symptoms,
+            "severity": self.severity,
+            "confidence": self.confidence,
+            "recommendations": list(self.recommendations),
+            "note": self.note
+        }
+
+    @classmethod
+    def from_analysis(cls, symptoms, analysis, timestamp=None):
+        """
+        Builds an entry from the SymptomAnalyzer result dict ({"Analysis Results": {...}}).
+        """
+        results = analysis.get("Analysis Results", analysis) if isinstance(analysis, dict) else {}
+        confidence = results.get("Confidence")
+        try:
+            confidence = float(str(confidence).rstrip("%")) if confidence is not None else None
+        except ValueError:
+            confidence = None
+        return cls(
+            timestamp=timestamp or datetime.now(timezone.utc),
+            symptoms=symptoms,
+            severity=results.get("Severity", "N/A"),
+            confidence=confidence,
+            recommendations=list(results.get("Recommendations", [])),
+            note=results.get("⚠️ Note", results.get("Note", ""))
+        )
+
+    @classmethod
+    def from_bson(cls, doc):
+        """
+        Decodes canonical documents and legacy ones that nest the analyzer output
+        (possibly as a JSON string) under `recommendation` with an ISO timestamp. Raises
+        ValueError without a usable timestamp rather than stamping the entry with "now".
+        """
+        if doc.get("timestamp") is None:
+            raise ValueError("Symptom entry has no timestamp")
+        if "severity" in doc:
+            return cls(
+                timestamp=doc["timestamp"],
+                symptoms=doc.get("symptoms", ""),
+                severity=doc.get("severity", "N/A"),
+                confidence=doc.get("confidence"),
+                recommendations=doc.get("recommendations", []),
+                note=doc.get("note", "")
+            )
+        recommendation = doc.get("recommendation", {})
+        if isinstance(recommendation, str):
+            try:
+                recommendation = json.loads(recommendation)
+            except ValueError:
+                recommendation = {}
+        if isinstance(recommendation, list) and recommendation and isinstance(recommendation[0], dict):
+            recommendation = recommendation[0]
+        return cls.from_analysis(doc.get("symptoms", ""), recommendation, timestamp=to_utc(doc["timestamp"]))
+
+
+def decode_wellness_columns(docs):
+    """
+    Decodes wellness_data entries straight into NumPy columns for charting, skipping goal
+    and malformed entries. Returns a dict of equally long arrays sorted by timestamp.
+    """
+    logs = []
+    for doc in docs:
+        if not WellnessLog.is_log(doc):
+            continue
+        try:
+            logs.append(WellnessLog.from_bson(doc))
+        except (KeyError, TypeError, ValueError):
+            continue
+    n = len(logs)
+    columns = {
+        "timestamp": np.array([log.timestamp.replace(tzinfo=None) for log in logs], dtype="datetime64[us]"),
+        "mood_code": np.fromiter((log.mood_code for log in logs), dtype=np.int8, count=n),
+        "sleep_hours": np.fromiter((log.sleep_hours for log in logs), dtype=np.float32, count=n),
+        "water_glasses": np.fromiter((log.water_glasses for log in logs), dtype=np.int16, count=n),
+        "exercise_minutes": np.fromiter((log.exercise_minutes for log in logs), dtype=np.int16, count=n)
+    }
+    order = np.argsort(columns["timestamp"], kind="stable")
+    return {name: values[order] for name, values in columns.items()}
@@ -1,8 +1,20 @@
 import os
-import re
+import io
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd  # type: ignore
 import PyPDF2  # type: ignore
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, pipeline  # type: ignore
+from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, AutoModelForSequenceClassification, TextIteratorStreamer, pipeline  # type: ignore
 from config.config import Config
+from utils.inference import configure_torch_threads, inference_slot, embed_texts
+from utils.metrics import instrument, timed, STAGE_SECONDS
+from utils.profiling import profiled, trace_memory
+from utils.text_ranking import rank_sentences, centroid_summary
+from utils.near_duplicates import filter_near_duplicates
+from utils.summary_cache import SummaryCache, chunk_key, preset_key
+from utils.text_index import SentenceIndex, BOILERPLATE_PATTERN, WHITESPACE_PATTERN, SENTENCE_SPLIT_PATTERN
 
 def chunk_text(text, max_length=1024):
     chunks = []
@@ -12,8 +24,8 @@ def chunk_text(text, max_length=1024):
         start += max_length
     return chunks
 
-def remove_duplicate_sentences(summary):
-    sentences = re.split(r'(?<=[.!?])\s+', summary)
+def remove_duplicate_sentences(summary, threshold=Config.NEAR_DUPLICATE_THRESHOLD):
+    sentences = SENTENCE_SPLIT_PATTERN.split(summary)
     seen = set()
     unique_sentences = []
     for sent in sentences:
@@ -21,80 +33,393 @@ def remove_duplicate_sentences(summary):
         if s and s.lower() not in seen:
             unique_sentences.append(s)
             seen.add(s.lower())
+    # Chunk summaries often paraphrase each other; drop near-duplicates as well
+    if threshold is not None:
+        unique_sentences = filter_near_duplicates(unique_sentences, threshold=threshold)
     return ' '.join(unique_sentences).strip()
 
 def remove_boilerplate(text):
-    pattern = re.compile(r"(References|REFERENCES).*$", re.DOTALL)
-    text = pattern.sub("", text)
-    return text
+    cut = BOILERPLATE_PATTERN.search(text)
+    return text[:cut.start()] if cut else text
+
+# Bump when the analysis pipeline changes in a way that should invalidate stored results
+ANALYSIS_VERSION = "2"
+
+# Decoding presets for non-streamed summaries (Config.SUMMARY_DECODING); part of the chunk cache
+# key alongside the model and length limits. "beam" is the reference output; check any other preset
+# with benchmarks/summary_parity.py before switching to it.
+DECODING_PRESETS = {
+    "beam": {"num_beams": 6, "no_repeat_ngram_size": 3, "repetition_penalty": 2.0, "early_stopping": True},
+    "beam_fast": {"num_beams": 3, "no_repeat_ngram_size": 3, "repetition_penalty": 2.0, "early_stopping": True, "use_cache": True},
+    "greedy": {"num_beams": 1, "do_sample": False, "no_repeat_ngram_size": 3, "repetition_penalty": 2.0, "use_cache": True},
+    # Greedy output, but a small draft model (SUMMARY_DRAFT_MODEL, same tokenizer) proposes several
+    # tokens that Pegasus verifies in one forward pass
+    "assisted": {"num_beams": 1, "do_sample": False, "no_repeat_ngram_size": 3, "repetition_penalty": 2.0, "use_cache": True},
+}
+# Explicit greedy settings: the checkpoint's generation config may default to beam search,
+# which generate() refuses to combine with a streamer
+STREAM_DECODING = {"num_beams": 1, "do_sample": False, "no_repeat_ngram_size": 3, "repetition_penalty": 2.0}
 
 class ResearchAnalyzer:
-    def __init__(self, models_dir="models"):
+    def __init__(self, models_dir="models", classifier_model=Config.RESEARCH_CLASSIFIER_MODEL,
+                 summary_model=Config.SUMMARY_MODEL, summary_tokenizer=Config.SUMMARY_TOKENIZER,
+                 decoding=Config.SUMMARY_DECODING, draft_model=Config.SUMMARY_DRAFT_MODEL):
         self.models_dir = models_dir
+        self.summary_model = summary_model
+        configure_torch_threads()
 
         # Load classifier model and tokenizer from huggingface repo with subfolders
-        self.tokenizer = AutoTokenizer.from_pretrained("Krishna2908/pubmedbert_hf", subfolder="tokenizer")
-        self.model = AutoModelForSequenceClassification.from_pretrained("Krishna2908/pubmedbert_hf", subfolder="model")
+        self.tokenizer = AutoTokenizer.from_pretrained(classifier_model, subfolder="tokenizer")
+        self.model = AutoModelForSequenceClassification.from_pretrained(classifier_model, subfolder="model")
 
         # Load Pegasus summarization model and tokenizer from subfolders in repo
         self.summarizer = pipeline(
             "summarization",
-            model="Krishna2908/PegasusXSum",
-            tokenizer="Krishna2908/PegasusXSum_tokenizer"
+            model=summary_model,
+            tokenizer=summary_tokenizer
         )
+        self.summary_cache = SummaryCache() if Config.SUMMARY_CACHE_ENABLED else None
+        self.set_decoding(decoding, draft_model)
+
+    def set_decoding(self, decoding, draft_model=None):
+        """
+        Switches the decoding preset; "assisted" loads `draft_model` as the assistant.
+        Presets that change the output also change model_version, so stored analyses made
+        with another preset are not reused.
+        """
+        if decoding not in DECODING_PRESETS:
+            raise ValueError(f"Unknown decoding preset {decoding!r}; expected one of {sorted(DECODING_PRESETS)}")
+        if decoding == "assisted" and not draft_model:
+            raise ValueError("Assisted decoding needs a draft model (SUMMARY_DRAFT_MODEL)")
+        self.decoding = decoding
+        self.draft_model = AutoModelForSeq2SeqLM.from_pretrained(draft_model).eval() if decoding == "assisted" else None
+        # The target model verifies every drafted token, so assisted output is the greedy output
+        output_preset = "greedy" if decoding == "assisted" else decoding
+        self.decoding_params = DECODING_PRESETS[output_preset]
+        self.model_version = f"{self.summary_model}@{ANALYSIS_VERSION}" + ("" if output_preset == "beam" else f"+{output_preset}")
+        # Streamed summaries are always greedy, so they are stored and looked up under their own version
+        self.stream_model_version = f"{self.summary_model}@{ANALYSIS_VERSION}+stream"
+
+    def _assistant_kwargs(self):
+        return {"assistant_model": self.draft_model} if self.draft_model is not None else {}
 
 
     @staticmethod
     def clean_text(text):
-        text = re.sub(r'\s+', ' ', text)
-        return text.strip()
+        return WHITESPACE_PATTERN.sub(' ', text).strip()
+
+    @instrument("generate")
+    def _summarize(self, chunks, default_summary_len=250, min_length=120, batch_size=1):
+        with inference_slot("summarize"):
+            summary_output = self.summarizer(
+                chunks,
+                max_length=default_summary_len,
+                min_length=min_length,
+                truncation=True,
+                # Assisted generation only handles one sequence at a time
+                batch_size=1 if self.draft_model is not None else batch_size,
+                **DECODING_PRESETS[self.decoding],
+                **self._assistant_kwargs()
+            )
+        return [output['summary_text'] for output in summary_output]
 
+    def _summarize_cached(self, chunks, default_summary_len=250, min_length=120, batch_size=1):
+        """
+        _summarize behind the chunk cache: only chunks not seen before under this model and
+        decoding preset reach Pegasus, and repeated chunks within one call are generated once.
+        """
+        if self.summary_cache is None:
+            return self._summarize(chunks, default_summary_len, min_length, batch_size)
+        preset = preset_key(self.model_version, max_length=default_summary_len, min_length=min_length, **self.decoding_params)
+        keys = [chunk_key(chunk, preset) for chunk in chunks]
+        summaries = {key: self.summary_cache.get(key) for key in dict.fromkeys(keys)}
+        missing = [key for key, summary in summaries.items() if summary is None]
+        if missing:
+            chunk_for = dict(zip(reversed(keys), reversed(chunks)))
+            start = time.perf_counter()
+            generated = self._summarize([chunk_for[key] for key in missing], default_summary_len, min_length, min(batch_size, len(missing)))
+            per_chunk_s = (time.perf_counter() - start) / len(missing)
+            for key, summary in zip(missing, generated):
+                self.summary_cache.put(key, summary, per_chunk_s)
+                summaries[key] = summary
+        return [summaries[key] for key in keys]
+
+    @instrument("summarize")
     def multi_chunk_summarize(self, text, chunk_size=1024, default_summary_len=250, min_length=120, max_chunks=2):
         chunks = chunk_text(text, max_length=chunk_size)
         chunk_summaries = []
         for i, chunk in enumerate(chunks[:max_chunks]):
             try:
-                summary_output = self.summarizer(
-                    chunk,
-                    max_length=default_summary_len,
-                    min_length=min_length,
-                    truncation=True,
-                    num_beams=6,
-                    no_repeat_ngram_size=3,
-                    repetition_penalty=2.0,
-                    early_stopping=True
-                )
-                chunk_summaries.append(summary_output[0]['summary_text'])
+                chunk_summaries.extend(self._summarize_cached([chunk], default_summary_len, min_length))
             except Exception as e:
                 print(f"Error summarizing chunk {i}: {e}")
         combined_text = " ".join(chunk_summaries)
         return remove_duplicate_sentences(combined_text)
 
+    @instrument("batch_summarize")
+    def batch_summarize(self, texts, chunk_size=1024, default_summary_len=250, min_length=120, max_chunks=2,
+                        batch_size=Config.SUMMARY_BATCH_SIZE):
+        """
+        Summarizes several documents at once. Chunks from all documents are pooled into
+        batches of `batch_size` so each generate() call keeps the model busy; a failing
+        batch is retried chunk by chunk so one bad chunk does not sink the others.
+        """
+        pooled = []  # (document position, chunk)
+        for doc_id, text in enumerate(texts):
+            pooled.extend((doc_id, chunk) for chunk in chunk_text(text, max_length=chunk_size)[:max_chunks])
+
+        per_document = [[] for _ in texts]
+        for start in range(0, len(pooled), batch_size):
+            batch = pooled[start:start + batch_size]
+            try:
+                summaries = self._summarize_cached([chunk for _, chunk in batch], default_summary_len, min_length, batch_size=len(batch))
+            except Exception as e:
+                print(f"Error summarizing batch at chunk {start}, retrying per chunk: {e}")
+                summaries = []
+                for _, chunk in batch:
+                    try:
+                        summaries.extend(self._summarize_cached([chunk], default_summary_len, min_length))
+                    except Exception as chunk_error:
+                        print(f"Error summarizing chunk: {chunk_error}")
+                        summaries.append("")
+            for (doc_id, _), summary in zip(batch, summaries):
+                per_document[doc_id].append(summary)
+        return [remove_duplicate_sentences(" ".join(parts)) for parts in per_document]
+
+    def stream_multi_chunk_summarize(self, text, stats=None, chunk_size=1024, default_summary_len=250, min_length=120, max_chunks=2):
+        """
+        Generator version of multi_chunk_summarize that yields text as Pegasus decodes it.
+        Streaming does not support beam search, so chunks are decoded greedily.
+        If `stats` is a dict it receives time_to_first_token_ms, total_ms, cached_chunks and
+        the de-duplicated final "summary" once the generator is exhausted. Cached chunks are
+        yielded whole without running the model.
+        """
+        stats = stats if stats is not None else {}
+        tokenizer = self.summarizer.tokenizer
+        model = self.summarizer.model
+        chunks = chunk_text(text, max_length=chunk_size)
+        chunk_summaries = []
+        start = time.perf_counter()
+        stats["time_to_first_token_ms"] = None
+        stats["cached_chunks"] = 0
+        preset = preset_key(self.stream_model_version, max_length=default_summary_len, min_length=min_length, **STREAM_DECODING)
+        for i, chunk in enumerate(chunks[:max_chunks]):
+            key = chunk_key(chunk, preset)
+            cached = self.summary_cache.get(key) if self.summary_cache is not None else None
+            if cached is not None:
+                if chunk_summaries:
+                    yield " "
+                if stats["time_to_first_token_ms"] is None:
+                    stats["time_to_first_token_ms"] = (time.perf_counter() - start) * 1000
+                stats["cached_chunks"] += 1
+                chunk_summaries.append(cached)
+                yield cached
+                continue
+            chunk_start = time.perf_counter()
+            inputs = tokenizer(chunk, return_tensors="pt", truncation=True)
+            streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True)
+            errors = []
+
+            def generate():
+                try:
+                    with inference_slot("summarize_stream"):
+                        model.generate(
+                            **inputs,
+                            streamer=streamer,
+                            max_length=default_summary_len,
+                            min_length=min_length,
+                            **STREAM_DECODING,
+                            **self._assistant_kwargs()
+                        )
+                except Exception as e:
+                    errors.append(e)
+                    streamer.end()  # unblock the consumer loop below
+
+            worker = threading.Thread(target=generate, daemon=True)
+            worker.start()
+            pieces = []
+            if chunk_summaries:
+                yield " "
+            for piece in streamer:
+                if not piece:
+                    continue
+                if stats["time_to_first_token_ms"] is None:
+                    stats["time_to_first_token_ms"] = (time.perf_counter() - start) * 1000
+                pieces.append(piece)
+                yield piece
+            worker.join()
+            if errors:
+                print(f"Error summarizing chunk {i}: {errors[0]}")
+            elif self.summary_cache is not None:
+                self.summary_cache.put(key, "".join(pieces).strip(), time.perf_counter() - chunk_start)
+            chunk_summaries.append("".join(pieces).strip())
+        stats["total_ms"] = (time.perf_counter() - start) * 1000
+        STAGE_SECONDS.observe(stats["total_ms"] / 1000, stage="summarize_stream")
+        stats["summary"] = remove_duplicate_sentences(" ".join(chunk_summaries))
+
+    @instrument("pdf_extract")
     def extract_text_from_pdf(self, pdf_file):
-        reader = PyPDF2.PdfReader(pdf_file)
-        text = " ".join([page.extract_text() or "" for page in reader.pages])
+        with trace_memory(f"pdf_extract-{getattr(pdf_file, 'name', 'upload')}"):
+            reader = PyPDF2.PdfReader(pdf_file)
+            text = " ".join([page.extract_text() or "" for page in reader.pages])
         return text
 
-    def extract_key_points(self, text, num_points=8):
-        sentences = re.split(r'(?<=[.!?])\s+', text)
-        filtered = [s.strip() for s in sentences if 8 < len(s.split()) < 30]
-        seen = set()
-        unique = []
-        for s in filtered:
-            if s.lower() not in seen:
-                unique.append(s)
-                seen.add(s.lower())
-        sorted_sentences = sorted(unique, key=lambda s: len(s.split()), reverse=True)[:num_points]
-        final_key_points = [" ".join(re.split(r'(?<=[.!?])\s+', kp)[:2]) for kp in sorted_sentences]
-        return final_key_points
-
-    def analyze_research_paper(self, pdf_file):
+    def embed(self, texts):
+        """
+        PubMedBERT embeddings (from the loaded classifier's encoder), used by the similarity index.
+        """
+        return embed_texts(self.tokenizer, self.model, list(texts))
+
+    @staticmethod
+    def embedding_text(analysis):
+        return " ".join([analysis.get("summary", "")] + list(analysis.get("key_points", [])))
+
+    @staticmethod
+    def candidate_sentences(index):
+        return index.unique_sentences(index.select(min_words=8, max_words=30))
+
+    def extract_key_points(self, text, num_points=8, sentences=None):
+        if sentences is None:
+            index = text if isinstance(text, SentenceIndex) else SentenceIndex.from_raw(text)
+            sentences = self.candidate_sentences(index)
+        # TextRank centrality with MMR de-duplication over TF-IDF sentence vectors
+        return [sentences[i] for i in rank_sentences(sentences, num_points)]
+
+    def prepare_document(self, pdf_file):
+        """
+        Extracts the PDF text and normalizes it once into a SentenceIndex shared by every later stage.
+        """
+        text = self.extract_text_from_pdf(pdf_file)
+        with timed("sentence_index"):
+            return SentenceIndex.from_raw(text)
+
+    @instrument("preview")
+    def build_preview(self, index, num_points=8, num_summary_sentences=3):
+        """
+        Instant extractive preview: key points plus a centroid summary, no neural model involved.
+        """
+        sentences = self.candidate_sentences(index)
+        return {
+            "summary": centroid_summary(sentences, num_summary_sentences),
+            "key_points": self.extract_key_points(index, num_points, sentences=sentences)
+        }
+
+    @profiled("research_batch")
+    def analyze_research_papers(self, pdf_files, max_workers=Config.PDF_EXTRACTION_WORKERS):
+        """
+        Batch version of analyze_research_paper. Identical uploads (same SHA-256) are analyzed
+        once, PDFs are extracted in parallel, and summarization is batched across papers.
+        Returns one result per input file, in order; repeats carry `duplicate_of`.
+        """
+        uploads = []
+        for i, pdf_file in enumerate(pdf_files):
+            data = pdf_file.getvalue() if hasattr(pdf_file, "getvalue") else pdf_file.read()
+            uploads.append({
+                "file_name": getattr(pdf_file, "name", f"paper_{i + 1}.pdf"),
+                "content_hash": hashlib.sha256(data).hexdigest(),
+                "data": data
+            })
+
+        unique = {}
+        for upload in uploads:
+            unique.setdefault(upload["content_hash"], upload)
+
+        def prepare(upload):
+            start = time.perf_counter()
+            try:
+                index = self.prepare_document(io.BytesIO(upload["data"]))
+                preview = self.build_preview(index)
+                return upload["content_hash"], index, preview, None, (time.perf_counter() - start) * 1000
+            except Exception as e:
+                return upload["content_hash"], None, None, str(e), (time.perf_counter() - start) * 1000
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            prepared = list(pool.map(prepare, unique.values()))
+
+        ready = [p for p in prepared if p[3] is None]
+        start = time.perf_counter()
+        summaries = self.batch_summarize([index.text for _, index, _, _, _ in ready]) if ready else []
+        summarize_ms = (time.perf_counter() - start) * 1000
+        summaries_by_hash = {p[0]: summary for p, summary in zip(ready, summaries)}
+
+        analyses = {}
+        for content_hash, index, preview, error, extract_ms in prepared:
+            if error is not None:
+                analyses[content_hash] = {"error": error, "message": "Failed to analyze paper"}
+                continue
+            summary = summaries_by_hash.get(content_hash, "")
+            analyses[content_hash] = {
+                "summary": summary or preview["summary"],
+                "summary_source": "abstractive" if summary else "extractive",
+                "key_points": preview["key_points"],
+                "model_version": self.model_version,
+                # summarize_ms covers the whole shared batch
+                "timings": {"extract_ms": extract_ms, "batch_summarize_ms": summarize_ms}
+            }
+
+        results = []
+        for upload in uploads:
+            first = unique[upload["content_hash"]]
+            result = {"file_name": upload["file_name"], "content_hash": upload["content_hash"], **analyses[upload["content_hash"]]}
+            if first is not upload:
+                result["duplicate_of"] = first["file_name"]
+            results.append(result)
+        return results
+
+    @staticmethod
+    def results_to_dataframe(results):
+        """
+        Flattens batch results into one row per file, for display and CSV export.
+        """
+        rows = [{
+            "file_name": r["file_name"],
+            "content_hash": r["content_hash"],
+            "duplicate_of": r.get("duplicate_of", ""),
+            "summary_source": r.get("summary_source", ""),
+            "summary": r.get("summary", ""),
+            "key_points": " | ".join(r.get("key_points", [])),
+            "error": r.get("error", "")
+        } for r in results]
+        return pd.DataFrame(rows)
+
+    @staticmethod
+    def content_hash(pdf_file):
+        if hasattr(pdf_file, "getvalue"):
+            return hashlib.sha256(pdf_file.getvalue()).hexdigest()
+        data = pdf_file.read()
+        pdf_file.seek(0)
+        return hashlib.sha256(data).hexdigest()
+
+    @profiled("research_analysis")
+    def analyze_research_paper(self, pdf_file, on_preview=None):
+        """
+        Returns the abstractive summary together with the extractive preview and per-stage timings (ms).
+        `on_preview` is called with the preview as soon as it is ready, before summarization starts.
+        """
         try:
-            text = self.extract_text_from_pdf(pdf_file)
-            text = remove_boilerplate(text)
-            text = self.clean_text(text)
-            summary = self.multi_chunk_summarize(text)
-            key_points = self.extract_key_points(text)
-            return {"summary": summary, "key_points": key_points}
+            timings = {}
+            start = time.perf_counter()
+            index = self.prepare_document(pdf_file)
+            timings["extract_ms"] = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            preview = self.build_preview(index)
+            timings["preview_ms"] = (time.perf_counter() - start) * 1000
+            if on_preview is not None:
+                on_preview({**preview, "timings": dict(timings)})
+
+            start = time.perf_counter()
+            summary = self.multi_chunk_summarize(index.text)
+            timings["summarize_ms"] = (time.perf_counter() - start) * 1000
+
+            return {
+                # Every chunk failing leaves the extractive preview summary in place
+                "summary": summary or preview["summary"],
+                "summary_source": "abstractive" if summary else "extractive",
+                "key_points": preview["key_points"],
+                "model_version": self.model_version,
+                "preview": preview,
+                "timings": timings
+            }
         except Exception as e:
             return {"error": str(e), "message": "Failed to analyze paper"}
@@ -0,0 +1,229 @@
+import os
+import hashlib
+import threading
+import numpy as np  # type: ignore
+
+_BLOCK_ROWS = 65536
+
+# Index names under Config.EMBEDDING_INDEX_DIR
+RESEARCH_INDEX = "research"
+SYMPTOM_INDEX = "symptoms"
+
+
+def owner_key(owner):
+    """
+    Stable 64-bit key for an owner id, stored per row so searches can be restricted to one user.
+    """
+    digest = hashlib.blake2b(str(owner).encode(), digest_size=8).digest()
+    return np.frombuffer(digest, dtype=np.int64)[0]
+
+
+def tombstone_owner(directory, name, owner):
+    """
+    Hides every row of `owner` from searches of index `name` (in any process) without
+    loading the index; EmbeddingIndex.compact() later removes the rows from disk.
+    """
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, f"{name}.deleted"), "ab") as f:
+        f.write(np.array([owner_key(owner)], dtype=np.int64).tobytes())
+
+
+class EmbeddingIndex:
+    """
+    Append-only nearest-neighbour index over L2-normalised embeddings.
+
+    Vectors live in one float16 file that is memory-mapped for search, so hundreds of
+    thousands of rows cost half the RAM of float32 and are paged in on demand. Row ids
+    and owner keys are kept in sidecar files. Search is brute force in blocks, or an
+    inverted-file (IVF) probe once `build_ivf` has clustered the rows; rows added after
+    the last build are always scanned directly. Owners listed in the `.deleted` sidecar
+    (tombstone_owner) are never returned, and compact() drops their rows for good.
+    """
+
+    def __init__(self, directory, name, dim):
+        os.makedirs(directory, exist_ok=True)
+        self.dim = dim
+        self.directory, self.name = directory, name
+        base = os.path.join(directory, name)
+        self.vectors_path = f"{base}.f16"
+        self.owners_path = f"{base}.owners"
+        self.ids_path = f"{base}.ids"
+        self.ivf_path = f"{base}.ivf.npz"
+        self.tombstones_path = f"{base}.deleted"
+        self._lock = threading.Lock()
+        self._ids = []
+        if os.path.exists(self.ids_path):
+            with open(self.ids_path, encoding="utf-8") as f:
+                self._ids = [line.rstrip("\n") for line in f]
+        # A crash between the three appends leaves the files out of step; trust the shortest
+        self._count = min(len(self._ids), self._rows_on_disk(self.vectors_path, dim * 2), self._rows_on_disk(self.owners_path, 8))
+        self._ids = self._ids[:self._count]
+        self._vectors = None
+        self._owners = None
+        self._ivf = None
+        self._tombstones = np.zeros(0, dtype=np.int64)
+        self._tombstones_size = 0
+
+    @staticmethod
+    def _rows_on_disk(path, row_bytes):
+        return os.path.getsize(path) // row_bytes if os.path.exists(path) else 0
+
+    def __len__(self):
+        return self._count
+
+    def _load_tombstones(self):
+        # The sidecar only grows between compactions, so its size tells whether to re-read it
+        size = os.path.getsize(self.tombstones_path) if os.path.exists(self.tombstones_path) else 0
+        if size != self._tombstones_size:
+            self._tombstones = np.fromfile(self.tombstones_path, dtype=np.int64) if size else np.zeros(0, dtype=np.int64)
+            self._tombstones_size = size
+        return self._tombstones
+
+    def remove_owner(self, owner):
+        tombstone_owner(self.directory, self.name, owner)
+
+    def _open(self):
+        if self._vectors is None or len(self._vectors) != self._count:
+            if self._count == 0:
+                self._vectors = np.zeros((0, self.dim), dtype=np.float16)
+                self._owners = np.zeros(0, dtype=np.int64)
+            else:
+                self._vectors = np.memmap(self.vectors_path, dtype=np.float16, mode="r", shape=(self._count, self.dim))
+                self._owners = np.memmap(self.owners_path, dtype=np.int64, mode="r", shape=(self._count,))
+        if self._ivf is None and os.path.exists(self.ivf_path):
+            with np.load(self.ivf_path) as data:
+                self._ivf = {key: data[key] for key in data.files}
+        return self._vectors, self._owners
+
+    def add(self, ids, vectors, owner):
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = (vectors / np.where(norms == 0, 1, norms)).astype(np.float16)
+        owners = np.full(len(vectors), owner_key(owner), dtype=np.int64)
+        with self._lock:
+            with open(self.vectors_path, "ab") as f:
+                f.write(vectors.tobytes())
+            with open(self.owners_path, "ab") as f:
+                f.write(owners.tobytes())
+            with open(self.ids_path, "a", encoding="utf-8") as f:
+                f.writelines(f"{row_id}\n" for row_id in ids)
+            self._ids.extend(str(row_id) for row_id in ids)
+            self._count += len(vectors)
+
+    def _score_rows(self, vectors, owners, rows, query, owner, tombstones):
+        """
+        Scores `rows` (a slice or index array) against the query; other owners' and
+        tombstoned rows get -inf.
+        """
+        scores = vectors[rows].astype(np.float32) @ query
+        if owner is not None:
+            scores[owners[rows] != owner_key(owner)] = -np.inf
+        if tombstones.size:
+            scores[np.isin(owners[rows], tombstones)] = -np.inf
+        return scores
+
+    def search(self, query, k=5, owner=None, exclude_ids=(), n_probe=8):
+        """
+        Returns up to k (id, cosine similarity) pairs, best first.
+        """
+        with self._lock:
+            vectors, owners = self._open()
+            count = self._count
+            ids = self._ids
+            tombstones = self._load_tombstones()
+        if count == 0:
+            return []
+        query = np.asarray(query, dtype=np.float32).ravel()
+        query = query / (np.linalg.norm(query) or 1.0)
+        exclude_ids = set(exclude_ids)
+        want = k + len(exclude_ids)
+
+        candidate_rows, candidate_scores = [], []
+        if self._ivf is not None:
+            ivf = self._ivf
+            probe = np.argsort(-(ivf["centroids"] @ query))[:n_probe]
+            rows = np.concatenate([ivf["order"][ivf["offsets"][l]:ivf["offsets"][l + 1]] for l in probe])
+            scanned_until = int(ivf["count"])
+            candidate_rows.append(rows)
+            candidate_scores.append(self._score_rows(vectors, owners, rows, query, owner, tombstones))
+        else:
+            scanned_until = 0
+        for start in range(scanned_until, count, _BLOCK_ROWS):
+            stop = min(start + _BLOCK_ROWS, count)
+            scores = self._score_rows(vectors, owners, slice(start, stop), query, owner, tombstones)
+            top = np.argpartition(-scores, min(want, len(scores) - 1))[:want]
+            candidate_rows.append(top + start)
+            candidate_scores.append(scores[top])
+
+        rows = np.concatenate(candidate_rows)
+        scores = np.concatenate(candidate_scores)
+        results = []
+        for i in np.argsort(-scores):
+            if not np.isfinite(scores[i]) or len(results) == k:
+                break
+            row_id = ids[rows[i]]
+            if row_id not in exclude_ids:
+                results.append((row_id, float(scores[i])))
+        return results
+
+    def build_ivf(self, n_lists=None, iterations=10, sample_size=50000, seed=0):
+        """
+        Clusters the current rows with spherical k-means so searches only scan the
+        `n_probe` closest lists. Worth running offline once the index reaches ~50k rows.
+        """
+        with self._lock:
+            vectors, _ = self._open()
+            count = self._count
+        if count == 0:
+            return
+        rng = np.random.default_rng(seed)
+        n_lists = n_lists or max(1, int(np.sqrt(count)))
+        sample = vectors[np.sort(rng.choice(count, min(count, sample_size), replace=False))].astype(np.float32)
+        centroids = sample[rng.choice(len(sample), min(n_lists, len(sample)), replace=False)]
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = np.where(norms > 0, sums / np.where(norms == 0, 1, norms), centroids)
+
+        lists = np.empty(count, dtype=np.int32)
+        for start in range(0, count, _BLOCK_ROWS):
+            stop = min(start + _BLOCK_ROWS, count)
+            lists[start:stop] = np.argmax(vectors[start:stop].astype(np.float32) @ centroids.T, axis=1)
+        order = np.argsort(lists, kind="stable").astype(np.int64)
+        offsets = np.searchsorted(lists[order], np.arange(len(centroids) + 1)).astype(np.int64)
+        np.savez(self.ivf_path, centroids=centroids, order=order, offsets=offsets, count=np.int64(count))
+        with self._lock:
+            self._ivf = {"centroids": centroids, "order": order, "offsets": offsets, "count": np.int64(count)}
+
+    def compact(self):
+        """
+        Rewrites the index without tombstoned owners' rows and clears the tombstones; the IVF
+        lists are dropped (row positions change), so run build_ivf again afterwards. Like
+        build_ivf, run it offline: other processes holding this index must reopen it.
+        Returns the number of rows removed.
+        """
+        with self._lock:
+            vectors, owners = self._open()
+            tombstones = self._load_tombstones()
+            if not tombstones.size:
+                return 0
+            keep = ~np.isin(np.asarray(owners), tombstones)
+            removed = int(self._count - keep.sum())
+            kept_ids = [row_id for row_id, kept in zip(self._ids, keep) if kept]
+            for path, data in ((self.vectors_path, np.asarray(vectors)[keep].tobytes()),
+                               (self.owners_path, np.asarray(owners)[keep].tobytes()),
+                               (self.ids_path, "".join(f"{row_id}\n" for row_id in kept_ids).encode("utf-8"))):
+                with open(f"{path}.tmp", "wb") as f:
+                    f.write(data)
+            self._vectors = self._owners = None  # release the memmaps before replacing their files
+            del vectors, owners
+            for path in (self.vectors_path, self.owners_path, self.ids_path):
+                os.replace(f"{path}.tmp", path)
+            for path in (self.ivf_path, self.tombstones_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._ids, self._count, self._ivf = kept_ids, len(kept_ids), None
+            self._tombstones, self._tombstones_size = np.zeros(0, dtype=np.int64), 0
+            return removed
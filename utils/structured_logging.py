@@ -0,0 +1,122 @@
+"""
+Structured JSON logging for the data and auth layers.
+
+Callers only pay for putting a record on a queue; a single listener thread formats it and
+writes it to stderr. Every record carries the correlation id of the page render (or API
+request) that produced it, set with correlation_scope(). DEBUG records are sampled at
+Config.LOG_DEBUG_SAMPLE_RATE so hot-path debug events can stay enabled.
+
+    log = get_logger(__name__)
+    log.error("Error saving wellness log", extra=fields(user_id=user_id, error=str(e)))
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from config.config import Config
+
+ROOT_LOGGER = "healthease"
+
+_correlation_id = contextvars.ContextVar("correlation_id", default=None)
+_configure_lock = threading.Lock()
+_listener = None
+
+
+def fields(**values):
+    """
+    Structured key/values for a record: log.info("...", extra=fields(user_id=...)).
+    """
+    return {"fields": values}
+
+
+def current_correlation_id():
+    return _correlation_id.get()
+
+
+@contextmanager
+def correlation_scope(name=None, correlation_id=None):
+    """
+    Tags every record logged inside the block (in this thread / task) with one id.
+    """
+    token = _correlation_id.set(correlation_id or f"{name + '-' if name else ''}{uuid.uuid4().hex[:12]}")
+    try:
+        yield _correlation_id.get()
+    finally:
+        _correlation_id.reset(token)
+
+
+class _ContextFilter(logging.Filter):
+    """
+    Runs in the calling thread (before the queue), so the context variable is still visible.
+    Also drops all but a sample of DEBUG records.
+    """
+
+    def __init__(self, debug_sample_rate):
+        super().__init__()
+        self.debug_sample_rate = debug_sample_rate
+
+    def filter(self, record):
+        if record.levelno < logging.INFO and random.random() >= self.debug_sample_rate:
+            return False
+        record.correlation_id = _correlation_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "func": record.funcName,
+            "msg": record.getMessage(),
+            "correlation_id": getattr(record, "correlation_id", None),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # Keep the record's attributes (fields, correlation id) for the listener's formatter;
+        # the stock prepare() pre-formats the message and drops exc_info.
+        if record.args:
+            record.msg, record.args = record.getMessage(), None
+        return record
+
+
+def configure_logging(level=None, debug_sample_rate=None, stream=None):
+    """
+    Installs the queue handler and its listener thread on the "healthease" logger. Idempotent.
+    """
+    global _listener
+    with _configure_lock:
+        root = logging.getLogger(ROOT_LOGGER)
+        if _listener is not None:
+            return root
+        log_queue = queue.SimpleQueue()
+        handler = _QueueHandler(log_queue)
+        handler.addFilter(_ContextFilter(Config.LOG_DEBUG_SAMPLE_RATE if debug_sample_rate is None else debug_sample_rate))
+        output = logging.StreamHandler(stream)
+        output.setFormatter(JsonFormatter())
+        _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+        root.addHandler(handler)
+        root.setLevel(level or Config.LOG_LEVEL)
+        root.propagate = False
+        return root
+
+
+def get_logger(name):
+    configure_logging()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name.rsplit('.', 1)[-1]}")
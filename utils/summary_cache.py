@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from config.config import Config
+from utils.metrics import REGISTRY
+from utils.structured_logging import get_logger, fields
+from utils.text_index import WHITESPACE_PATTERN
+
+log = get_logger(__name__)
+
+# The disk tier is pruned (age, then total size) after this many writes from one process
+_PRUNE_EVERY = 256
+
+CACHE_LOOKUPS = REGISTRY.counter("healthease_summary_cache_total", "Chunk summary lookups by tier served", labels=("result",))
+CACHE_SAVED = REGISTRY.counter("healthease_summary_cache_saved_seconds_total", "Estimated generate() time skipped by cache hits")
+
+
+def preset_key(model_version, **decoding):
+    """
+    Canonical string for everything besides the input that determines a chunk's summary.
+    """
+    return json.dumps({"model": model_version, **decoding}, sort_keys=True, separators=(",", ":"))
+
+
+def chunk_key(chunk, preset):
+    """
+    Chunks differing only in whitespace (PDF line breaks, page joins) share one entry.
+    """
+    normalized = WHITESPACE_PATTERN.sub(" ", chunk).strip()
+    return hashlib.sha256(f"{preset}\x00{normalized}".encode()).hexdigest()
+
+
+class SummaryCache:
+    """
+    Two-tier cache of chunk summaries. Papers share whole regions (consent statements,
+    methods boilerplate, preprint headers), so a repeated chunk is looked up in an in-process
+    LRU and then in a directory of small files (`<dir>/ab/abcdef....txt`, written atomically and
+    shared by every process on the host) before Pegasus is asked to summarize it.
+
+    Disk entries expire `max_age_days` after they were written and the oldest go first once
+    the directory exceeds `max_mb`. Disk errors only cost the disk tier, never a summary.
+    """
+
+    def __init__(self, directory=None, memory_items=None, max_mb=None, max_age_days=None):
+        self.directory = Config.SUMMARY_CACHE_DIR if directory is None else directory
+        self.memory_items = Config.SUMMARY_CACHE_MEMORY_ITEMS if memory_items is None else memory_items
+        self.max_bytes = (Config.SUMMARY_CACHE_MAX_MB if max_mb is None else max_mb) * 2 ** 20
+        self.max_age_s = (Config.SUMMARY_CACHE_MAX_AGE_DAYS if max_age_days is None else max_age_days) * 86400
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._prune_lock = threading.Lock()
+        self._writes = 0
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stored": 0, "generate_s": 0.0, "saved_s": 0.0}
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.txt")
+
+    def _remember(self, key, summary):
+        with self._lock:
+            self._memory[key] = summary
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def _mean_generate_s(self):
+        stored = self._stats["stored"]
+        return self._stats["generate_s"] / stored if stored else 0.0
+
+    def _hit(self, tier):
+        with self._lock:
+            self._stats[f"{tier}_hits"] += 1
+            saved = self._mean_generate_s()
+            self._stats["saved_s"] += saved
+        CACHE_LOOKUPS.inc(result=tier)
+        CACHE_SAVED.inc(saved)
+
+    def get(self, key):
+        with self._lock:
+            summary = self._memory.get(key)
+            if summary is not None:
+                self._memory.move_to_end(key)
+        if summary is not None:
+            self._hit("memory")
+            return summary
+        if self.directory:
+            path = self._path(key)
+            try:
+                if time.time() - os.path.getmtime(path) < self.max_age_s:
+                    with open(path, encoding="utf-8") as f:
+                        summary = f.read()
+            except OSError:
+                summary = None
+            if summary is not None:
+                self._remember(key, summary)
+                self._hit("disk")
+                return summary
+        with self._lock:
+            self._stats["misses"] += 1
+        CACHE_LOOKUPS.inc(result="miss")
+        return None
+
+    def put(self, key, summary, generate_s=0.0):
+        """
+        Stores one summary; `generate_s` (what producing it cost) feeds the savings estimate.
+        Empty summaries from failed chunks are not cached.
+        """
+        if not summary:
+            return
+        self._remember(key, summary)
+        with self._lock:
+            self._stats["stored"] += 1
+            self._stats["generate_s"] += generate_s
+        if self.directory:
+            self._write(key, summary)
+
+    def _write(self, key, summary):
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(summary)
+            os.replace(tmp, path)  # readers never see a partial file
+        except OSError as e:
+            # Read-only or full disk: the summary stays in the memory tier
+            log.warning("Summary cache write failed", extra=fields(path=path, error=str(e)))
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+        with self._lock:
+            self._writes += 1
+            due = self._writes % _PRUNE_EVERY == 1
+        if due:
+            self.prune()
+
+    def prune(self):
+        """
+        Deletes expired entries, then the oldest ones until the directory fits in `max_mb`.
+        Returns the number of files removed; concurrent calls in one process are skipped.
+        """
+        if not self.directory or not self._prune_lock.acquire(blocking=False):
+            return 0
+        removed = 0
+        try:
+            now = time.time()
+            entries = []
+            for root, _, names in os.walk(self.directory):
+                for name in names:
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+            entries.sort()
+            total = sum(size for _, size, _ in entries)
+            for mtime, size, path in entries:
+                if now - mtime < self.max_age_s and total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    removed += 1
+                    total -= size
+                except OSError:
+                    pass
+        finally:
+            self._prune_lock.release()
+        if removed:
+            log.info("Summary cache pruned", extra=fields(removed=removed, remaining_bytes=total))
+        return removed
+
+    def stats(self):
+        """
+        Hit counts per tier, hit rate and the estimated generate() seconds saved.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_items"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["lookups"] = lookups
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
@@ -1,16 +1,40 @@
 import os
+import threading
+import time
 import torch # type: ignore
 import json
 import random
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
+from config.config import Config
+from utils.inference import configure_torch_threads, inference_slot, embed_texts
+from utils.metrics import instrument, STAGE_SECONDS
+from utils.profiling import profiled
 
 class SymptomAnalyzer:
-    def __init__(self, model_path="Krishna2908/clinicalbert_finetuned"):
+    def __init__(self, model_path=Config.SEVERITY_MODEL, distilled_model_path=Config.DISTILLED_SEVERITY_MODEL,
+                 confidence_threshold=Config.MIN_CONFIDENCE_THRESHOLD):
         self.model_path = model_path
+        self.distilled_model_path = distilled_model_path
+        self.confidence_threshold = confidence_threshold
+        configure_torch_threads()
 
         self.tokenizer = AutoTokenizer.from_pretrained(model_path)
         self.model = AutoModelForSequenceClassification.from_pretrained(model_path)
 
+        # Cascade: the distilled classifier answers first when configured
+        self.distilled_tokenizer = None
+        self.distilled_model = None
+        if distilled_model_path:
+            self.distilled_tokenizer = AutoTokenizer.from_pretrained(distilled_model_path)
+            self.distilled_model = AutoModelForSequenceClassification.from_pretrained(distilled_model_path)
+
+        self._stats_lock = threading.Lock()
+        self._tier_stats = {
+            "distilled": {"requests": 0, "total_ms": 0.0},
+            "full": {"requests": 0, "total_ms": 0.0},
+            "escalations": 0
+        }
+
         
         self.label_mapping = {
             0: "Mild",
@@ -91,6 +115,7 @@ class SymptomAnalyzer:
             ]
         }
 
+    @profiled("symptom_analysis")
     def analyze_symptoms(self, user_input):
         """
         Analyzes the symptom input and predicts:
@@ -113,19 +138,59 @@ class SymptomAnalyzer:
         except Exception as e:
             return json.dumps({"error": str(e), "message": "Failed to analyze symptoms"})
 
+    @instrument("severity")
     def get_severity_level(self, text):
         """
-        Uses the fine-tuned ClinicalBERT model to determine the severity level.
+        Determines the severity level. When a distilled model is configured it answers first,
+        and only predictions below the confidence threshold escalate to the fine-tuned ClinicalBERT model.
         """
-        inputs = self.tokenizer(text, return_tensors="pt", padding=True, truncation=True, max_length=128)
-        with torch.no_grad():
-            outputs = self.model(**inputs)
+        if self.distilled_model is not None:
+            severity_level, confidence_score = self._classify(self.distilled_tokenizer, self.distilled_model, text, "distilled")
+            if confidence_score / 100 >= self.confidence_threshold:
+                return severity_level, confidence_score
+            with self._stats_lock:
+                self._tier_stats["escalations"] += 1
+        return self._classify(self.tokenizer, self.model, text, "full")
+
+    def _classify(self, tokenizer, model, text, tier):
+        start = time.perf_counter()
+        inputs = tokenizer(text, return_tensors="pt", padding=True, truncation=True, max_length=128)
+        with inference_slot(f"severity_{tier}"):
+            outputs = model(**inputs)
             logits = outputs.logits
             predicted_label_id = torch.argmax(logits, dim=1).item()
         severity_level = self.label_mapping.get(predicted_label_id, "Unknown")
         confidence_score = torch.nn.functional.softmax(logits, dim=1)[0][predicted_label_id].item() * 100
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        STAGE_SECONDS.observe(elapsed_ms / 1000, stage=f"severity_{tier}")
+        with self._stats_lock:
+            self._tier_stats[tier]["requests"] += 1
+            self._tier_stats[tier]["total_ms"] += elapsed_ms
         return severity_level, confidence_score
 
+    def embed(self, texts):
+        """
+        ClinicalBERT embeddings for symptom descriptions, used by the similarity index.
+        """
+        return embed_texts(self.tokenizer, self.model, list(texts), max_length=128)
+
+    def get_cascade_stats(self):
+        """
+        Returns per-tier request counts and mean latency, plus the escalation rate of the distilled tier.
+        """
+        with self._stats_lock:
+            stats = {"escalations": self._tier_stats["escalations"]}
+            for tier in ("distilled", "full"):
+                requests = self._tier_stats[tier]["requests"]
+                total_ms = self._tier_stats[tier]["total_ms"]
+                stats[tier] = {
+                    "requests": requests,
+                    "mean_latency_ms": total_ms / requests if requests else 0.0
+                }
+        distilled_requests = stats["distilled"]["requests"]
+        stats["escalation_rate"] = stats["escalations"] / distilled_requests if distilled_requests else 0.0
+        return stats
+
     def generate_recommendations(self, severity):
         """
         Provides a set of three recommendations randomly selected from a larger list based on the severity level.
@@ -0,0 +1,77 @@
+import re
+import numpy as np  # type: ignore
+
+BOILERPLATE_PATTERN = re.compile(r"References|REFERENCES")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+SENTENCE_BOUNDARY_PATTERN = re.compile(r"(?<=[.!?]) ")
+SENTENCE_SPLIT_PATTERN = re.compile(r"(?<=[.!?])\s+")
+
+
+class SentenceIndex:
+    """
+    One normalized copy of a document plus sentence offsets into it.
+
+    Built once per paper: the references section is cut off, whitespace is collapsed,
+    and sentence boundaries and word counts are recorded as NumPy arrays. Every later
+    stage (preview, key points, chunking) slices this buffer instead of re-scanning
+    and copying the full text.
+    """
+    __slots__ = ("text", "starts", "ends", "word_counts")
+
+    def __init__(self, text, starts, ends, word_counts):
+        self.text = text
+        self.starts = starts
+        self.ends = ends
+        self.word_counts = word_counts
+
+    @classmethod
+    def from_raw(cls, raw_text):
+        cut = BOILERPLATE_PATTERN.search(raw_text)
+        end = cut.start() if cut else len(raw_text)
+        text = WHITESPACE_PATTERN.sub(" ", raw_text[:end]).strip()
+        if not text:
+            empty = np.zeros(0, dtype=np.int64)
+            return cls("", empty, empty, empty)
+
+        # After whitespace collapsing every boundary is punctuation followed by one space
+        next_starts = np.fromiter((m.end() for m in SENTENCE_BOUNDARY_PATTERN.finditer(text)), dtype=np.int64)
+        starts = np.concatenate(([0], next_starts))
+        ends = np.concatenate((next_starts - 1, [len(text)]))
+        # Single spaces separate words, so counting them per sentence stays in C
+        word_counts = np.fromiter(
+            (text.count(" ", s, e) + 1 for s, e in zip(starts.tolist(), ends.tolist())),
+            dtype=np.int64, count=len(starts)
+        )
+        return cls(text, starts, ends, word_counts)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def sentence(self, i):
+        return self.text[self.starts[i]:self.ends[i]]
+
+    def sentences(self, indices=None):
+        if indices is None:
+            indices = range(len(self))
+        return [self.sentence(i) for i in indices]
+
+    def select(self, min_words=8, max_words=30):
+        """
+        Indices of sentences with strictly between min_words and max_words words.
+        """
+        mask = (self.word_counts > min_words) & (self.word_counts < max_words)
+        return np.flatnonzero(mask)
+
+    def unique_sentences(self, indices):
+        """
+        Sentences at `indices`, dropping case-insensitive repeats, in document order.
+        """
+        seen = set()
+        unique = []
+        for i in indices:
+            s = self.sentence(i)
+            key = s.lower()
+            if key not in seen:
+                unique.append(s)
+                seen.add(key)
+        return unique
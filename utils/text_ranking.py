@@ -0,0 +1,90 @@
+import numpy as np  # type: ignore
+from sklearn.feature_extraction.text import TfidfVectorizer  # type: ignore
+
+
+def sentence_similarity(sentences):
+    """
+    Cosine similarity between TF-IDF sentence vectors. Rows are L2-normalised by the
+    vectorizer, so one sparse product gives the full matrix.
+    Returns None when the sentences share no usable vocabulary.
+    """
+    vectorizer = TfidfVectorizer(stop_words="english", sublinear_tf=True)
+    try:
+        vectors = vectorizer.fit_transform(sentences)
+    except ValueError:  # empty vocabulary, e.g. only stop words or numbers
+        return None
+    return (vectors @ vectors.T).toarray()
+
+
+def textrank_scores(similarity, damping=0.85, max_iter=100, tol=1e-6):
+    """
+    PageRank over the sentence similarity graph (TextRank), via power iteration.
+    """
+    n = similarity.shape[0]
+    weights = similarity.copy()
+    np.fill_diagonal(weights, 0.0)
+    row_sums = weights.sum(axis=1, keepdims=True)
+    # Sentences with no overlap spread their score uniformly instead of leaking it
+    transition = np.divide(weights, row_sums, out=np.full_like(weights, 1.0 / n), where=row_sums > 0)
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        updated = (1 - damping) / n + damping * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < tol:
+            return updated
+        scores = updated
+    return scores
+
+
+def mmr_select(scores, similarity, k, diversity=0.5):
+    """
+    Maximal Marginal Relevance: greedily picks high-scoring sentences while penalising
+    similarity to the ones already picked. Returns indices in selection order.
+    """
+    n = len(scores)
+    relevance = scores / scores.max() if scores.max() > 0 else scores
+    max_sim = np.zeros(n)
+    available = np.ones(n, dtype=bool)
+    selected = []
+    for _ in range(min(k, n)):
+        mmr = np.where(available, (1 - diversity) * relevance - diversity * max_sim, -np.inf)
+        best = int(np.argmax(mmr))
+        selected.append(best)
+        available[best] = False
+        max_sim = np.maximum(max_sim, similarity[best])
+    return selected
+
+
+def rank_sentences(sentences, num_sentences=8, diversity=0.5):
+    """
+    Returns the indices of the most central, mutually diverse sentences, best first.
+    Falls back to document order when the sentences cannot be vectorised.
+    """
+    if len(sentences) <= 1:
+        return list(range(len(sentences)))
+    similarity = sentence_similarity(sentences)
+    if similarity is None:
+        return list(range(min(num_sentences, len(sentences))))
+    scores = textrank_scores(similarity)
+    return mmr_select(scores, similarity, num_sentences, diversity=diversity)
+
+
+def centroid_summary(sentences, num_sentences=3):
+    """
+    Picks the sentences closest to the TF-IDF centroid of the document, in document order.
+    Falls back to the lead sentences when the text cannot be vectorised.
+    """
+    if len(sentences) <= num_sentences:
+        return " ".join(sentences)
+    vectorizer = TfidfVectorizer(stop_words="english", sublinear_tf=True)
+    try:
+        vectors = vectorizer.fit_transform(sentences)
+    except ValueError:
+        return " ".join(sentences[:num_sentences])
+    centroid = np.asarray(vectors.mean(axis=0)).ravel()
+    norm = np.linalg.norm(centroid)
+    if norm == 0:
+        return " ".join(sentences[:num_sentences])
+    scores = vectors @ (centroid / norm)
+    picked = np.sort(np.argsort(-scores)[:num_sentences])
+    return " ".join(sentences[i] for i in picked)
@@ -0,0 +1,174 @@
+import numpy as np  # type: ignore
+import pandas as pd  # type: ignore
+from config.config import Config
+
+METRICS = ("sleep_hours", "water_glasses", "exercise_minutes")
+GOAL_FIELDS = ("sleep_goal", "water_goal", "exercise_goal")
+
+
+def _empty_state():
+    return {
+        "days": np.empty(0, dtype="datetime64[D]"),
+        "values": np.empty((0, len(METRICS))),
+        "rolling_7": np.empty((0, len(METRICS))),
+        "rolling_30": np.empty((0, len(METRICS))),
+        "z": np.empty((0, len(METRICS))),
+        # Running sums for expanding mean / std, used by the z-scores
+        "count": 0,
+        "sum": np.zeros(len(METRICS)),
+        "sumsq": np.zeros(len(METRICS)),
+        # Goal-hit streak ending on the last day, and the best streak seen
+        "streak": np.zeros(len(METRICS), dtype=np.int64),
+        "best_streak": np.zeros(len(METRICS), dtype=np.int64),
+    }
+
+
+class WellnessAnalytics:
+    """
+    Incremental daily trend analytics for one user's wellness logs.
+
+    Logs are reduced to one value per local calendar day (the day's last log). Each
+    `update` only processes logs newer than the previous call: rolling 7/30-day means,
+    goal-hit streaks and z-score anomaly flags for the new days are computed in one
+    vectorized pass and appended to the kept state. The newest day stays "open" until a
+    later day appears, since more logs may still arrive for it.
+    """
+
+    def __init__(self, goals, tz_name="UTC", anomaly_z=Config.WELLNESS_ANOMALY_Z,
+                 min_history_days=Config.WELLNESS_ANOMALY_MIN_DAYS):
+        self.goals = goals
+        self.goal_values = np.array([getattr(goals, name) for name in GOAL_FIELDS], dtype=np.float64)
+        self.tz_name = tz_name
+        self.anomaly_z = anomaly_z
+        self.min_history_days = min_history_days
+        self.last_timestamp = None
+        self._state = _empty_state()
+        self._open_day = None
+        self._open_values = None
+
+    def update(self, columns):
+        """
+        Consumes decode_wellness_columns() output; rows at or before the last seen timestamp are skipped.
+        """
+        timestamps = columns["timestamp"]
+        if self.last_timestamp is not None:
+            fresh = timestamps > self.last_timestamp
+            timestamps = timestamps[fresh]
+            values = np.column_stack([columns[m][fresh] for m in METRICS]).astype(np.float64)
+        else:
+            values = np.column_stack([columns[m] for m in METRICS]).astype(np.float64)
+        if not len(timestamps):
+            return self
+        self.last_timestamp = timestamps.max()
+
+        local = pd.DatetimeIndex(timestamps).tz_localize("UTC").tz_convert(self.tz_name)
+        days = local.tz_localize(None).values.astype("datetime64[D]")
+        if self._open_day is not None:
+            days = np.concatenate(([self._open_day], days))
+            values = np.vstack((self._open_values, values))
+
+        # Last log of each day wins: rows are time-sorted, so take each day's final index
+        unique_days, first_from_end = np.unique(days[::-1], return_index=True)
+        day_values = values[::-1][first_from_end]
+
+        self._state = self._extend(self._state, unique_days[:-1], day_values[:-1])
+        self._open_day, self._open_values = unique_days[-1], day_values[-1:]
+        return self
+
+    def _extend(self, state, days, values):
+        """
+        Returns a new state with `days` appended; the given state is left untouched.
+        """
+        k = len(days)
+        if k == 0:
+            return state
+        prev_days = state["days"]
+
+        # Rolling means over calendar windows, seeded with the previous 30 days of history
+        tail = prev_days > days[0] - np.timedelta64(30, "D")
+        frame = pd.DataFrame(
+            np.vstack((state["values"][tail], values)),
+            index=pd.DatetimeIndex(np.concatenate((prev_days[tail], days)))
+        )
+        rolling_7 = frame.rolling("7D").mean().to_numpy()[-k:]
+        rolling_30 = frame.rolling("30D").mean().to_numpy()[-k:]
+
+        # z-score of each day against every earlier day (expanding mean / std)
+        cum_sum = state["sum"] + np.vstack((np.zeros(len(METRICS)), np.cumsum(values, axis=0)[:-1]))
+        cum_sumsq = state["sumsq"] + np.vstack((np.zeros(len(METRICS)), np.cumsum(values ** 2, axis=0)[:-1]))
+        n = (state["count"] + np.arange(k))[:, None].astype(np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = cum_sum / n
+            std = np.sqrt(np.maximum(cum_sumsq / n - mean ** 2, 0))
+            z = (values - mean) / std
+        z[(n[:, 0] < self.min_history_days) | ~np.isfinite(z).all(axis=1)] = np.nan
+
+        # Goal-hit streaks: a miss or a skipped calendar day restarts the run
+        hits = values >= self.goal_values
+        previous = np.concatenate((prev_days[-1:], days[:-1])) if len(prev_days) else np.concatenate(([days[0] - np.timedelta64(2, "D")], days[:-1]))
+        contiguous = (days - previous) == np.timedelta64(1, "D")
+        reset = ~hits | ~contiguous[:, None]
+        idx = np.arange(k)[:, None]
+        last_reset = np.maximum.accumulate(np.where(reset, idx, -1), axis=0)
+        at_reset = np.take_along_axis(hits, np.maximum(last_reset, 0), axis=0).astype(np.int64)
+        runs = np.where(last_reset >= 0, at_reset + idx - last_reset, state["streak"] + idx + 1)
+
+        return {
+            "days": np.concatenate((prev_days, days)),
+            "values": np.vstack((state["values"], values)),
+            "rolling_7": np.vstack((state["rolling_7"], rolling_7)),
+            "rolling_30": np.vstack((state["rolling_30"], rolling_30)),
+            "z": np.vstack((state["z"], z)),
+            "count": state["count"] + k,
+            "sum": state["sum"] + values.sum(axis=0),
+            "sumsq": state["sumsq"] + (values ** 2).sum(axis=0),
+            "streak": runs[-1],
+            "best_streak": np.maximum(state["best_streak"], runs.max(axis=0)),
+        }
+
+    def _current(self):
+        # The open day is evaluated on a throwaway copy so it can still change
+        if self._open_day is None:
+            return self._state
+        return self._extend(self._state, np.array([self._open_day]), self._open_values)
+
+    def daily_frame(self):
+        """
+        One row per day: values, rolling means, z-scores and anomaly flags.
+        """
+        state = self._current()
+        frame = pd.DataFrame(state["values"], columns=METRICS, index=pd.DatetimeIndex(state["days"], name="day"))
+        for i, metric in enumerate(METRICS):
+            frame[f"{metric}_7d"] = state["rolling_7"][:, i]
+            frame[f"{metric}_30d"] = state["rolling_30"][:, i]
+            frame[f"{metric}_z"] = state["z"][:, i]
+            frame[f"{metric}_anomaly"] = np.abs(state["z"][:, i]) >= self.anomaly_z
+        return frame
+
+    def summary(self, recent_days=7):
+        """
+        Latest rolling means, current / best goal streaks and anomalies in the last `recent_days`.
+        """
+        state = self._current()
+        if not len(state["days"]):
+            return None
+        last_day = state["days"][-1]
+        today = np.datetime64(pd.Timestamp.now(tz=self.tz_name).date(), "D")
+        # A streak only counts as current if it reaches yesterday or today
+        still_running = (today - last_day) <= np.timedelta64(1, "D")
+        recent = state["days"] > last_day - np.timedelta64(recent_days, "D")
+        anomalies = []
+        for i, metric in enumerate(METRICS):
+            flagged = recent & (np.abs(state["z"][:, i]) >= self.anomaly_z)
+            anomalies.extend(
+                {"day": str(day), "metric": metric, "value": float(value), "z": float(z)}
+                for day, value, z in zip(state["days"][flagged], state["values"][flagged, i], state["z"][flagged, i])
+            )
+        return {
+            "days_logged": len(state["days"]),
+            "rolling_7": dict(zip(METRICS, state["rolling_7"][-1].tolist())),
+            "rolling_30": dict(zip(METRICS, state["rolling_30"][-1].tolist())),
+            "current_streak": dict(zip(GOAL_FIELDS, (state["streak"] if still_running else np.zeros(len(METRICS), dtype=np.int64)).tolist())),
+            "best_streak": dict(zip(GOAL_FIELDS, state["best_streak"].tolist())),
+            "anomalies": sorted(anomalies, key=lambda a: a["day"], reverse=True),
+        }
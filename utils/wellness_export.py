@@ -0,0 +1,165 @@
+"""
+Streams wellness logs and symptom history out of MongoDB into Parquet files
+partitioned by year and month, for offline analytics.
+
+Run from the repo root (ideally against a secondary / read replica URI):
+    python -m utils.wellness_export --out exports --batch-size 5000
+
+Memory stays flat: documents are read through server-side cursors and written
+one batch at a time. Each run builds its datasets in a staging directory and then
+swaps them in whole, so re-exporting into the same --out replaces the data rather
+than adding to it. User ids are replaced with an HMAC pseudonym unless
+--keep-user-ids is passed.
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+import pyarrow as pa  # type: ignore
+import pyarrow.parquet as pq  # type: ignore
+from config.config import Config
+from utils.database import MongoDB
+from utils.records import WellnessLog, SymptomEntry
+
+WELLNESS_SCHEMA = pa.schema([
+    ("user", pa.string()),
+    ("timestamp", pa.timestamp("us", tz="UTC")),
+    ("mood_code", pa.int8()),
+    ("sleep_hours", pa.float64()),
+    ("water_glasses", pa.float64()),
+    ("exercise_minutes", pa.float64()),
+    ("year", pa.int16()),
+    ("month", pa.int8()),
+])
+
+SYMPTOM_SCHEMA = pa.schema([
+    ("user", pa.string()),
+    ("timestamp", pa.timestamp("us", tz="UTC")),
+    ("severity", pa.string()),
+    ("confidence", pa.float64()),
+    ("symptom_chars", pa.int32()),
+    ("year", pa.int16()),
+    ("month", pa.int8()),
+])
+
+
+class WellnessExporter:
+    def __init__(self, db=None, out_dir="exports", batch_size=5000, pseudonymize=True):
+        self.db = db if db is not None else MongoDB().get_database()
+        self.out_dir = out_dir
+        self.batch_size = batch_size
+        self.pseudonymize = pseudonymize
+        self._key = (Config.SECRET_KEY or "").encode()
+
+    def _user(self, user_id):
+        user_id = str(user_id)
+        if not self.pseudonymize:
+            return user_id
+        return hmac.new(self._key, user_id.encode(), hashlib.sha256).hexdigest()[:16]
+
+    def iter_wellness_rows(self):
+        # $unwind on the server so each daily log arrives as its own small document
+        pipeline = [
+            {"$project": {"wellness_data": 1}},
+            {"$unwind": "$wellness_data"},
+            {"$match": {"$or": [{"wellness_data.mood_code": {"$exists": True}}, {"wellness_data.mood": {"$exists": True}}]}},
+        ]
+        for doc in self.db.users.aggregate(pipeline, allowDiskUse=True, batchSize=self.batch_size):
+            try:
+                log = WellnessLog.from_bson(doc["wellness_data"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            yield {
+                "user": self._user(doc["_id"]),
+                "timestamp": log.timestamp,
+                "mood_code": log.mood_code,
+                "sleep_hours": log.sleep_hours,
+                "water_glasses": float(log.water_glasses),
+                "exercise_minutes": float(log.exercise_minutes),
+                "year": log.timestamp.year,
+                "month": log.timestamp.month,
+            }
+
+    def iter_symptom_rows(self):
+        for doc in self.db["symptom_history"].find({}, batch_size=self.batch_size):
+            try:
+                entry = SymptomEntry.from_bson(doc)
+            except (KeyError, TypeError, ValueError):
+                continue
+            yield {
+                "user": self._user(doc.get("user_id")),
+                "timestamp": entry.timestamp,
+                "severity": entry.severity,
+                "confidence": entry.confidence,
+                # Free-text symptoms stay in Mongo; only their length is exported
+                "symptom_chars": len(entry.symptoms or ""),
+                "year": entry.timestamp.year,
+                "month": entry.timestamp.month,
+            }
+
+    def _write(self, rows, schema, dataset):
+        root = os.path.join(self.out_dir, dataset)
+        run_id = f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')}-{os.getpid()}"
+        staging = f"{root}.tmp-{run_id}"
+        batch, part, total = [], 0, 0
+        try:
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    self._flush(batch, schema, staging, f"{run_id}-{part}")
+                    total += len(batch)
+                    batch, part = [], part + 1
+            if batch:
+                self._flush(batch, schema, staging, f"{run_id}-{part}")
+                total += len(batch)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        self._swap_in(staging, root, run_id)
+        return total
+
+    @staticmethod
+    def _swap_in(staging, root, run_id):
+        """
+        Replaces `root` with the finished staging directory; readers see either run, never a mix.
+        """
+        os.makedirs(staging, exist_ok=True)  # an empty export still replaces the old data
+        previous = f"{root}.old-{run_id}"
+        if os.path.exists(root):
+            os.replace(root, previous)
+        os.replace(staging, root)
+        shutil.rmtree(previous, ignore_errors=True)
+
+    @staticmethod
+    def _flush(batch, schema, root, part_name):
+        table = pa.Table.from_pylist(batch, schema=schema)
+        pq.write_to_dataset(
+            table, root_path=root, partition_cols=["year", "month"],
+            basename_template=f"part-{part_name}-{{i}}.parquet"
+        )
+
+    def export(self):
+        """
+        Writes both datasets and returns the number of rows exported for each.
+        """
+        return {
+            "wellness": self._write(self.iter_wellness_rows(), WELLNESS_SCHEMA, "wellness"),
+            "symptoms": self._write(self.iter_symptom_rows(), SYMPTOM_SCHEMA, "symptoms"),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default="exports")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--keep-user-ids", action="store_true", help="export raw user ids instead of pseudonyms")
+    args = parser.parse_args()
+    exporter = WellnessExporter(out_dir=args.out, batch_size=args.batch_size, pseudonymize=not args.keep_user_ids)
+    print(json.dumps(exporter.export()))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,27 +2,60 @@
 import streamlit as st  # type: ignore
 import plotly.express as px  # type: ignore
 import pandas as pd  # type: ignore
-from datetime import datetime
+from datetime import datetime, timezone
+import numpy as np  # type: ignore
 import pytz # type: ignore
+from config.config import Config
 from utils.database import MongoDB
+from utils.downsample import lttb
+from utils.records import MOOD_SCALE, WellnessLog, WellnessGoals, decode_wellness_columns
+from utils.wellness_analytics import WellnessAnalytics
+
+
+@st.cache_resource(max_entries=256, show_spinner=False)
+def build_progress_figures(_db, user_id, data_version, tz_name, max_points=Config.WELLNESS_CHART_MAX_POINTS):
+    """
+    Builds the progress figures and summary stats once per (user, data version).
+    Saves and resets bump the version, so stale entries are simply never asked for again.
+    Figures are only read by st.plotly_chart, so the shared objects are safe to reuse.
+    Returns None when the user has no daily logs.
+    """
+    columns = decode_wellness_columns(_db.get_user_wellness_logs(user_id) or [])
+    if not len(columns["timestamp"]):
+        return None
+    timestamps = pd.DatetimeIndex(columns["timestamp"]).tz_localize("UTC").tz_convert(tz_name)
+    x = columns["timestamp"].view(np.int64)
+
+    def series(name):
+        keep = lttb(x, columns[name], max_points)
+        return pd.DataFrame({"timestamp": timestamps[keep], name: columns[name][keep]})
+
+    return {
+        "sleep": px.line(series("sleep_hours"), x="timestamp", y="sleep_hours", title="Sleep Pattern Over Time"),
+        "exercise": px.bar(series("exercise_minutes"), x="timestamp", y="exercise_minutes", title="Exercise Minutes Over Time"),
+        "water": px.line(series("water_glasses"), x="timestamp", y="water_glasses", title="Water Intake Over Time"),
+        # Stats use every row, not the downsampled series
+        "averages": {name: float(columns[name].mean()) for name in ("sleep_hours", "exercise_minutes", "water_glasses")},
+        "points": len(x)
+    }
+
 
 class WellnessTracker:
-    def __init__(self):
-        self.db = MongoDB()
+    def __init__(self, db=None):
+        self.db = db if db is not None else MongoDB()
         self.local_tz = pytz.timezone("Asia/Kolkata")  # Set your local timezone
 
     def render_dashboard(self):
         st.subheader("Wellness Tracking Dashboard")
 
-        tab1, tab2, tab3 = st.tabs(["Daily Log", "Progress", "Goals"])
+        # A radio instead of st.tabs: tabs execute every panel on each rerun, this renders only the visible one
+        view = st.radio("View", ["Daily Log", "Progress", "Goals"], horizontal=True, label_visibility="collapsed", key="wellness_view")
 
-        with tab1:
+        if view == "Daily Log":
             self.render_daily_log()
-
-        with tab2:
+        elif view == "Progress":
             self.render_progress_charts()
-
-        with tab3:
+        else:
             self.render_goals_section()
 
     def render_daily_log(self):
@@ -33,7 +66,7 @@ class WellnessTracker:
         with col1:
             mood = st.select_slider(
                 "How are you feeling today?",
-                options=["😔", "😐", "🙂", "😊", "🤗"]
+                options=list(MOOD_SCALE)
             )
 
             sleep_hours = st.number_input(
@@ -59,14 +92,13 @@ class WellnessTracker:
             )
 
         if st.button("Save Daily Log"):
-            timestamp = datetime.now(self.local_tz).isoformat()
-            log_data = {
-                "timestamp": timestamp,
-                "mood": mood,
-                "sleep_hours": sleep_hours,
-                "water_glasses": water_glasses,
-                "exercise_minutes": exercise_minutes
-            }
+            log = WellnessLog(
+                timestamp=datetime.now(timezone.utc),
+                mood_code=MOOD_SCALE.index(mood),
+                sleep_hours=sleep_hours,
+                water_glasses=water_glasses,
+                exercise_minutes=exercise_minutes
+            )
 
             if "user" in st.session_state and st.session_state.user:
                 user_id = st.session_state.user.get('_id', None)
@@ -75,7 +107,7 @@ class WellnessTracker:
                     st.error("⚠️ User ID not found. Please log out and log in again.")
                     return
 
-                result = self.db.save_wellness_data(str(user_id), log_data)
+                result = self.db.save_wellness_log(str(user_id), log)
                 if result:
                     st.success("✅ Daily log saved successfully!")
                 else:
@@ -93,9 +125,10 @@ class WellnessTracker:
             st.error("⚠️ User ID not found. Please log out and log in again.")
             return
 
-        data = self.db.get_user_wellness_data(str(user_id))
+        data_version = self.db.get_wellness_version(str(user_id))
+        figures = build_progress_figures(self.db, str(user_id), data_version, self.local_tz.zone)
 
-        if not data:
+        if figures is None:
             st.info("ℹ️ No wellness data available yet. Start logging daily to see your progress!")
             return
 
@@ -104,55 +137,90 @@ class WellnessTracker:
             if deleted:
                 st.warning("⚠️ All wellness data has been reset. Start fresh!")
 
-                if "wellness_data" in st.session_state:
-                    del st.session_state["wellness_data"]
+                for key in ("wellness_data", "wellness_analytics"):
+                    st.session_state.pop(key, None)
                 st.rerun()
             else:
                 st.error("❌ Failed to reset wellness data.")
 
-        daily_logs = [entry for entry in data if "mood" in entry]
-        if not daily_logs:
-            st.info("ℹ️ No daily log entries found.")
-            return
-
-        df = pd.DataFrame(daily_logs)
-        if "timestamp" in df.columns:
-            df["timestamp"] = pd.to_datetime(df["timestamp"])
-
-            if df["timestamp"].dt.tz is None:
-                df["timestamp"] = df["timestamp"].dt.tz_localize("UTC")
-
-            df["timestamp"] = df["timestamp"].dt.tz_convert(self.local_tz)
+        if figures["points"] > Config.WELLNESS_CHART_MAX_POINTS:
+            st.caption(f"Charts show {Config.WELLNESS_CHART_MAX_POINTS} representative points out of {figures['points']} logs.")
 
         st.subheader("📊 Sleep Pattern Over Time")
-        fig_sleep = px.line(df, x="timestamp", y="sleep_hours", title="Sleep Pattern Over Time")
-        st.plotly_chart(fig_sleep)
+        st.plotly_chart(figures["sleep"])
 
         st.subheader("🏋️ Exercise Duration Over Time")
-        fig_exercise = px.bar(df, x="timestamp", y="exercise_minutes", title="Exercise Minutes Over Time")
-        st.plotly_chart(fig_exercise)
+        st.plotly_chart(figures["exercise"])
 
         st.subheader("💧 Daily Water Consumption Trend")
-        fig_water = px.line(df, x="timestamp", y="water_glasses", title="Water Intake Over Time")
-        st.plotly_chart(fig_water)
+        st.plotly_chart(figures["water"])
 
         # Extra: Display summary statistics
+        averages = figures["averages"]
         st.subheader("Summary Statistics")
-        st.write(f"Average Sleep Hours: {df['sleep_hours'].mean():.2f}")
-        st.write(f"Average Exercise Minutes: {df['exercise_minutes'].mean():.2f}")
-        st.write(f"Average Daily Water Intake: {df['water_glasses'].mean():.2f}")
+        st.write(f"Average Sleep Hours: {averages['sleep_hours']:.2f}")
+        st.write(f"Average Exercise Minutes: {averages['exercise_minutes']:.2f}")
+        st.write(f"Average Daily Water Intake: {averages['water_glasses']:.2f}")
+
+        self.render_trends(str(user_id))
+
+    def get_trend_analytics(self, user_id):
+        """
+        The session keeps one WellnessAnalytics per user and feeds it only logs newer than the
+        last one it saw. It is rebuilt from scratch when the user or their goals change.
+        """
+        goals = self.get_current_goals()
+        key = (user_id, goals.sleep_goal, goals.water_goal, goals.exercise_goal)
+        cached = st.session_state.get("wellness_analytics")
+        if cached is None or cached[0] != key:
+            cached = (key, WellnessAnalytics(goals, tz_name=self.local_tz.zone))
+            st.session_state["wellness_analytics"] = cached
+        analytics = cached[1]
+        since = None
+        if analytics.last_timestamp is not None:
+            since = pd.Timestamp(analytics.last_timestamp).tz_localize("UTC").to_pydatetime()
+        return analytics.update(decode_wellness_columns(self.db.get_wellness_logs_since(user_id, since)))
+
+    def render_trends(self, user_id):
+        summary = self.get_trend_analytics(user_id).summary()
+        if summary is None:
+            return
+
+        st.subheader("📈 Trends & Streaks")
+        labels = (("sleep_hours", "sleep_goal", "Sleep (h)"), ("water_glasses", "water_goal", "Water (glasses)"), ("exercise_minutes", "exercise_goal", "Exercise (min)"))
+        for col, (metric, goal, label) in zip(st.columns(3), labels):
+            with col:
+                week, month = summary["rolling_7"][metric], summary["rolling_30"][metric]
+                st.metric(f"{label} · 7-day avg", f"{week:.1f}", f"{week - month:+.1f} vs 30-day")
+                st.caption(f"🔥 Goal streak: {summary['current_streak'][goal]} days (best {summary['best_streak'][goal]})")
+
+        for anomaly in summary["anomalies"]:
+            label = dict((m, l) for m, _, l in labels)[anomaly["metric"]]
+            direction = "above" if anomaly["z"] > 0 else "below"
+            st.warning(f"⚠️ {anomaly['day']}: {label} of {anomaly['value']:g} is unusually {direction} your usual range (z = {anomaly['z']:+.1f}).")
+
+    def get_current_goals(self):
+        """
+        Latest saved goals for the logged-in user, or the defaults.
+        """
+        user = st.session_state.get("user") or {}
+        saved = self.db.get_latest_wellness_goals(str(user["_id"])) if user.get("_id") else None
+        if saved:
+            return WellnessGoals.from_bson(saved)
+        return WellnessGoals(sleep_goal=8, water_goal=8, exercise_goal=30)
 
     def render_goals_section(self):
         st.subheader("🎯 Wellness Goals")
 
+        current = self.get_current_goals()
         col1, col2 = st.columns(2)
 
         with col1:
-            sleep_goal = st.number_input("Daily sleep goal (hours)", min_value=1, max_value=12, value=8)
-            water_goal = st.number_input("Daily water intake goal (glasses)", min_value=1, max_value=20, value=8)
+            sleep_goal = st.number_input("Daily sleep goal (hours)", min_value=1, max_value=12, value=int(current.sleep_goal))
+            water_goal = st.number_input("Daily water intake goal (glasses)", min_value=1, max_value=20, value=current.water_goal)
 
         with col2:
-            exercise_goal = st.number_input("Daily exercise goal (minutes)", min_value=1, max_value=300, value=30)
+            exercise_goal = st.number_input("Daily exercise goal (minutes)", min_value=1, max_value=300, value=current.exercise_goal)
 
         if st.button("Save Goals"):
             if "user" in st.session_state and st.session_state.user:
@@ -162,13 +230,8 @@ class WellnessTracker:
                     st.error("⚠️ User ID not found. Please log out and log in again.")
                     return
 
-                goals_data = {
-                    "sleep_goal": sleep_goal,
-                    "water_goal": water_goal,
-                    "exercise_goal": exercise_goal,
-                    "date_set": datetime.now(self.local_tz).isoformat()
-                }
-                result = self.db.save_wellness_data(str(user_id), {"goals": goals_data})
+                goals = WellnessGoals(sleep_goal=sleep_goal, water_goal=water_goal, exercise_goal=exercise_goal)
+                result = self.db.save_wellness_goals(str(user_id), goals)
                 if result:
                     st.success("✅ Goals updated successfully!")
                 else: